@@ -0,0 +1,71 @@
+"""
+Time and peak memory of large users reports, rendered in one pass or in
+chunks (sequentially and across the process pool):
+
+    python -m benchmarks.chunked_render --rows 10000 100000 500000
+
+Every variant runs in a fresh process so peak RSS isn't inherited from
+the previous one. Single-pass rendering grows superlinearly, so it is
+skipped above --single-pass-max rows.
+"""
+import argparse
+import os
+import resource
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from benchmarks import harness
+
+Row = namedtuple("Row", ["id", "username", "email", "is_active", "created_at"])
+
+
+def _rows(count: int):
+    created = datetime(2024, 1, 1)
+    return (Row(i, f"user{i}", f"user{i}@example.com", i % 5 != 0, created) for i in range(1, count + 1))
+
+
+def _render(rows: int, chunk_size: int, workers: int, results):
+    from services.pdf_service import PDFReportService
+
+    service = PDFReportService(chunk_size=chunk_size, workers=workers)
+    try:
+        started = time.perf_counter()
+        pdf = service.generate_users_report(_rows(rows), total_users=rows)
+        elapsed = time.perf_counter() - started
+    finally:
+        service.shutdown()
+    # ru_maxrss is in KiB on Linux; RUSAGE_CHILDREN is the largest pool worker
+    results.put({
+        "seconds": elapsed,
+        "renderer_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "pdf_mb": len(pdf) / 1024 / 1024,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--single-pass-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    harness.configure()
+    print(f"{'rows':>8}  {'variant':<28}{'seconds':>10}{'renderer MB':>13}{'worker MB':>11}{'PDF MB':>9}")
+    for rows in args.rows:
+        variants = {
+            f"chunked, {args.workers} workers": (args.chunk_size, args.workers),
+            "chunked, sequential": (args.chunk_size, 1),
+        }
+        if rows <= args.single_pass_max:
+            variants["single pass"] = (rows + 1, 1)
+        for label, (chunk_size, workers) in variants.items():
+            result = harness.run_in_process(_render, rows, chunk_size, workers)
+            print(f"{rows:>8}  {label:<28}{result['seconds']:>10.1f}{result['renderer_mb']:>13.0f}"
+                  f"{result['worker_mb']:>11.0f}{result['pdf_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Latency and throughput of concurrent POST /api/users/ requests:
+
+    python -m benchmarks.concurrent_signups --threads 8 --signups 200
+
+"before" is the previous handler, mounted on a scratch route: a SELECT
+for the email, a SELECT for the username, then the INSERT. "after" is
+the current single INSERT that lets the unique indexes reject
+duplicates. Every --duplicate-every-th signup of each thread uses a
+username all threads ask for at about the same time, so the check-then-
+insert race shows up as errors. Each variant runs in a fresh process
+against its own database.
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from benchmarks import harness
+
+VARIANTS = {
+    "before: SELECT x2 + INSERT": "/bench/select-then-insert/",
+    "after: single INSERT": "/api/users/",
+}
+
+
+def _mount_select_then_insert(app, path: str):
+    from fastapi import Depends, HTTPException, status
+    from sqlalchemy.orm import Session
+    from database import get_db
+    import models
+    import schemas
+    from services import cache
+    from services.cache import response_cache
+    from services.report_cache import bump_data_version
+
+    def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+        if db.query(models.User).filter(models.User.email == user.email).first():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+        if db.query(models.User).filter(models.User.username == user.username).first():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken")
+        db_user = models.User(**user.model_dump())
+        db.add(db_user)
+        bump_data_version(db, models.User)
+        db.commit()
+        response_cache.invalidate(cache.USERS)
+        db.refresh(db_user)
+        return db_user
+
+    app.add_api_route(path, create_user, methods=["POST"], response_model=schemas.User)
+
+
+def _workload(label: str, path: str, threads: int, signups: int, duplicate_every: int, results):
+    harness.configure()
+    from main import app
+
+    _mount_select_then_insert(app, VARIANTS["before: SELECT x2 + INSERT"])
+    prefix = label.split(":")[0]
+    outcomes: Counter = Counter()
+    samples = []
+    lock = threading.Lock()
+
+    with harness.app_client() as client:
+        harness.seed(users=1000)
+
+        def run(thread: int):
+            for n in range(signups):
+                if duplicate_every and n % duplicate_every == 0:
+                    name = f"{prefix}-shared-{n}"
+                else:
+                    name = f"{prefix}-{thread}-{n}"
+                started = time.perf_counter()
+                try:
+                    outcome = client.post(path, json={"username": name, "email": f"{name}@example.com"}).status_code
+                except Exception:
+                    # TestClient re-raises unhandled errors, which a server answers with a 500
+                    outcome = 500
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    outcomes[outcome] += 1
+                    samples.append(elapsed)
+
+        workers = [threading.Thread(target=run, args=(thread,)) for thread in range(threads)]
+        with harness.StatementCounter() as counter:
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            seconds = time.perf_counter() - started
+
+    samples.sort()
+    results.put({
+        "median_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "requests_per_s": len(samples) / seconds,
+        "statements": counter.count / len(samples),
+        "outcomes": dict(outcomes),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--signups", type=int, default=200, help="signups per thread")
+    parser.add_argument("--duplicate-every", type=int, default=10,
+                        help="every Nth signup contends for a shared username (0 disables)")
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.signups} signups, POST /api/users/")
+    print(f"{'variant':<30}{'median ms':>12}{'p95 ms':>12}{'req/s':>10}{'stmts/req':>12}"
+          f"{'200':>8}{'400':>8}{'500':>8}")
+    for label, path in VARIANTS.items():
+        result = harness.run_in_process(_workload, label, path, args.threads, args.signups, args.duplicate_every)
+        outcomes = result["outcomes"]
+        print(f"{label:<30}{result['median_ms']:>12.2f}{result['p95_ms']:>12.2f}"
+              f"{result['requests_per_s']:>10.0f}{result['statements']:>12.1f}"
+              f"{outcomes.get(200, 0):>8}{outcomes.get(400, 0):>8}{outcomes.get(500, 0):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Statements and latency of GET /api/dashboard/stats.
+
+Compares the endpoint (conditional aggregates plus the rollup tables)
+with the previous implementation's six count() queries and three
+GROUP BY scans of user_access, run against the same seeded database:
+
+    python -m benchmarks.dashboard_stats --access-rows 1000000
+"""
+import argparse
+
+from benchmarks import harness
+
+
+def legacy_stats(db):
+    """The stats queries as they were before rollups: one round trip per counter"""
+    from datetime import datetime, timedelta
+    from sqlalchemy import func
+    import models
+
+    seven_days_ago = datetime.utcnow() - timedelta(days=7)
+    counters = [
+        db.query(models.User).count(),
+        db.query(models.User).filter(models.User.is_active == True).count(),
+        db.query(models.Contact).count(),
+        db.query(models.Contact).filter(models.Contact.is_resolved == False).count(),
+        db.query(models.Item).count(),
+        db.query(models.UserAccess).filter(models.UserAccess.access_time >= seven_days_ago).count(),
+    ]
+    breakdowns = [
+        db.query(column, func.count(models.UserAccess.id)).filter(column.isnot(None)).group_by(column).all()
+        for column in (models.UserAccess.endpoint, models.UserAccess.method, models.UserAccess.status_code)
+    ]
+    return counters, breakdowns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--access-rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--contacts", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    harness.configure()
+    from database import SessionLocal
+    from services.cache import response_cache
+
+    with harness.app_client() as client:
+        with harness.timer(f"Seeded {args.access_rows} access rows"):
+            harness.seed(users=args.users, items=args.items, contacts=args.contacts,
+                         access_rows=args.access_rows)
+
+        def get_stats():
+            response = client.get("/api/dashboard/stats")
+            assert response.status_code == 200, response.text
+
+        def run_legacy():
+            db = SessionLocal()
+            try:
+                legacy_stats(db)
+            finally:
+                db.close()
+
+        harness.print_results(f"/api/dashboard/stats, {args.access_rows} access rows", {
+            "before: 6 counts + 3 GROUP BY": harness.measure(run_legacy, repeat=args.repeat),
+            "after: uncached request": harness.measure(
+                get_stats, repeat=args.repeat, before=response_cache.invalidate
+            ),
+            "after: cached request": harness.measure(get_stats, repeat=args.repeat),
+        })
+
+
+if __name__ == "__main__":
+    main()
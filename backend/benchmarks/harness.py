@@ -0,0 +1,224 @@
+"""
+Shared setup for the benchmarks in this package. Run them from backend/:
+
+    python -m benchmarks.dashboard_stats --access-rows 1000000
+
+configure() must run before any backend module is imported: settings are
+read from the environment at import time. Unless BENCH_DATABASE_URL is
+set, every run gets a scratch SQLite database in a temporary directory.
+"""
+import multiprocessing
+import os
+import queue
+import random
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+SEED_CHUNK_SIZE = 50000
+ENDPOINTS = ["/api/items/", "/api/users/", "/api/contact/", "/api/dashboard/stats", "/api/reports/users"]
+METHODS = ["GET", "GET", "GET", "POST", "PUT", "DELETE"]
+STATUS_CODES = [200, 200, 200, 201, 400, 404, 500]
+# Names of the app's own worker threads, whose statements aren't the request's
+BACKGROUND_THREADS = ("access-log-flusher", "report-job-slot-", "cache-refresh-")
+
+
+def configure(**overrides: str) -> str:
+    """Point the backend at a scratch database and output directories; returns the scratch dir"""
+    scratch_dir = tempfile.mkdtemp(prefix="backend-bench-")
+    env = {
+        "DATABASE_URL": os.getenv("BENCH_DATABASE_URL", f"sqlite:///{scratch_dir}/bench.db"),
+        "REPORT_OUTPUT_DIR": f"{scratch_dir}/generated_reports",
+        "REPORT_CACHE_DIR": f"{scratch_dir}/report_cache",
+        "ACCESS_LOG_ARCHIVE_DIR": f"{scratch_dir}/archive/access_logs",
+    }
+    env.update(overrides)
+    os.environ.update(env)
+    return scratch_dir
+
+
+def create_schema():
+    """Create the tables (and the default owner) like the app's lifespan does"""
+    from database import init_db
+
+    init_db()
+
+
+def _insert_chunks(model, rows: List[Dict[str, Any]], write=None):
+    from sqlalchemy import insert
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        for start in range(0, len(rows), SEED_CHUNK_SIZE):
+            chunk = rows[start:start + SEED_CHUNK_SIZE]
+            if write is None:
+                db.execute(insert(model), chunk)
+            else:
+                write(db, chunk)
+            db.commit()
+    finally:
+        db.close()
+
+
+def seed(users: int = 0, items: int = 0, contacts: int = 0, access_rows: int = 0, days: int = 30):
+    """Bulk-insert synthetic rows; access rows also update the dashboard rollups"""
+    import models
+    from services.access_log_buffer import write_access_logs
+
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    first_user = _max_id(models.User) + 1
+    _insert_chunks(models.User, [
+        {"username": f"bench{first_user + i}", "email": f"bench{first_user + i}@example.com",
+         "is_active": rng.random() < 0.8}
+        for i in range(users)
+    ])
+    user_ids = list(range(1, _max_id(models.User) + 1))
+    _insert_chunks(models.Item, [
+        {"title": f"Item {i}", "description": f"Description of item {i}",
+         "completed": rng.random() < 0.5, "owner_id": rng.choice(user_ids)}
+        for i in range(items)
+    ])
+    _insert_chunks(models.Contact, [
+        {"name": f"Contact {i}", "email": f"contact{i}@example.com", "subject": "Question",
+         "message": "Benchmark message", "is_resolved": rng.random() < 0.3}
+        for i in range(contacts)
+    ])
+    _insert_chunks(models.UserAccess, [
+        {"user_id": rng.choice(user_ids), "endpoint": rng.choice(ENDPOINTS), "method": rng.choice(METHODS),
+         "status_code": rng.choice(STATUS_CODES), "ip_address": "127.0.0.1", "user_agent": "bench",
+         "access_time": now - timedelta(seconds=rng.uniform(0, days * 86400))}
+        for _ in range(access_rows)
+    ], write=write_access_logs)
+
+
+def _max_id(model) -> int:
+    from sqlalchemy import func, select
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.max(model.id))) or 0
+    finally:
+        db.close()
+
+
+class StatementCounter:
+    """
+    Counts statements sent to the database (an executemany counts once).
+
+    Statements of the app's background threads (access log flushes,
+    report job slots, cache refreshes) are left out unless all_threads is
+    set, so the count is what the measured call itself sent.
+    """
+
+    def __init__(self, all_threads: bool = False):
+        from database import async_engine, engine
+
+        self.engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+        self.all_threads = all_threads
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.all_threads or not threading.current_thread().name.startswith(BACKGROUND_THREADS):
+            self.statements.append(statement)
+
+    def __enter__(self) -> "StatementCounter":
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+def measure(fn: Callable[[], Any], repeat: int = 20, warmup: int = 2,
+            before: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """
+    Time `fn` and count its statements.
+
+    `before` runs ahead of every call, outside the timing (e.g. to clear a
+    cache). Returns latency percentiles in milliseconds and the statements
+    per call.
+    """
+    for _ in range(warmup):
+        if before:
+            before()
+        fn()
+    samples = []
+    with StatementCounter() as counter:
+        for _ in range(repeat):
+            if before:
+                before()
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+        "statements": counter.count / repeat,
+    }
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]):
+    """Print one row per measured variant"""
+    print(f"\n{title}")
+    print(f"{'variant':<36}{'median ms':>12}{'p95 ms':>12}{'min ms':>12}{'stmts/call':>12}")
+    for label, result in results.items():
+        print(f"{label:<36}{result['median_ms']:>12.2f}{result['p95_ms']:>12.2f}"
+              f"{result['min_ms']:>12.2f}{result['statements']:>12.1f}")
+
+
+def run_in_process(target: Callable[..., Any], *args) -> Any:
+    """
+    Run target(*args, results) in a fresh spawned process and return what
+    it puts on `results`; raises if the process dies without a result.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # Not daemonic, so the target may start its own processes (e.g. a render pool)
+    process = context.Process(target=target, args=args + (results,))
+    process.start()
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError(f"Benchmark process exited with code {process.exitcode}")
+    process.join()
+    return result
+
+
+@contextmanager
+def app_client():
+    """TestClient for the app with its lifespan running"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@contextmanager
+def timer(label: str):
+    """Print how long a setup step took"""
+    started = time.perf_counter()
+    yield
+    print(f"{label}: {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,105 @@
+"""
+Serialization cost of large list responses (10k rows by default).
+
+"before" is the previous path: ORM objects (and a schemas.UserAccess built
+per access row), response_model validation, jsonable_encoder and stdlib
+json. "after" is the current path: rows projected straight from SQL and
+encoded by orjson, measured in process and as a full HTTP request:
+
+    python -m benchmarks.list_serialization --rows 10000
+"""
+import argparse
+import json
+from typing import List
+
+from benchmarks import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    harness.configure()
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import desc, select
+    from database import SessionLocal
+    import models
+    import schemas
+    from pagination import paginate_rows_by_id
+    from serialization import schema_columns
+    from services.access_partitions import paginate_access_logs
+
+    items_adapter = TypeAdapter(List[schemas.Item])
+    access_adapter = TypeAdapter(List[schemas.UserAccess])
+
+    def encode_like_response_model(adapter, objects) -> bytes:
+        validated = adapter.validate_python(objects, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+    def with_session(fn):
+        def run():
+            db = SessionLocal()
+            try:
+                fn(db)
+            finally:
+                db.close()
+        return run
+
+    def items_before(db):
+        encode_like_response_model(items_adapter, db.query(models.Item).offset(0).limit(args.rows).all())
+
+    def items_after(db):
+        rows, _ = paginate_rows_by_id(
+            db, select(*schema_columns(models.Item, schemas.Item)), models.Item.id, None, 0, args.rows
+        )
+        orjson.dumps(rows)
+
+    def access_before(db):
+        access_logs = db.query(models.UserAccess, models.User.username, models.User.email).join(
+            models.User, models.UserAccess.user_id == models.User.id, isouter=True
+        ).order_by(desc(models.UserAccess.access_time)).offset(0).limit(args.rows).all()
+        result = [
+            schemas.UserAccess(
+                id=access.id, user_id=access.user_id, access_time=access.access_time,
+                ip_address=access.ip_address, user_agent=access.user_agent, endpoint=access.endpoint,
+                method=access.method, status_code=access.status_code, username=username, email=email
+            )
+            for access, username, email in access_logs
+        ]
+        encode_like_response_model(access_adapter, result)
+
+    def access_after(db):
+        users = models.User.__table__
+        rows, _ = paginate_access_logs(db, lambda table: select(table, users.c.username, users.c.email).select_from(
+            table.outerjoin(users, table.c.user_id == users.c.id)
+        ), None, 0, args.rows)
+        orjson.dumps(rows)
+
+    with harness.app_client() as client:
+        with harness.timer(f"Seeded {args.rows} items and access rows"):
+            harness.seed(users=1000, items=args.rows, access_rows=args.rows)
+
+        def get(path):
+            def run():
+                response = client.get(path, params={"limit": args.rows})
+                assert response.status_code == 200 and len(response.json()) == args.rows
+            return run
+
+        harness.print_results(f"/api/items/, {args.rows} rows", {
+            "before: ORM + response_model + json": harness.measure(with_session(items_before), repeat=args.repeat),
+            "after: projected rows + orjson": harness.measure(with_session(items_after), repeat=args.repeat),
+            "after: HTTP request": harness.measure(get("/api/items/"), repeat=args.repeat),
+        })
+        harness.print_results(f"/api/dashboard/recent-access, {args.rows} rows", {
+            "before: ORM + response_model + json": harness.measure(with_session(access_before), repeat=args.repeat),
+            "after: projected rows + orjson": harness.measure(with_session(access_after), repeat=args.repeat),
+            "after: HTTP request": harness.measure(get("/api/dashboard/recent-access"), repeat=args.repeat),
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Per-report setup cost of PDFReportService: template compilation and
+stylesheet parsing, without the WeasyPrint layout that follows.
+
+"before" compiles the template and parses report.css for every report,
+as the inline templates used to; "after" is the service's cached
+Environment and shared stylesheet:
+
+    python -m benchmarks.report_setup
+"""
+import argparse
+import os
+
+from benchmarks import harness
+
+TEMPLATES = ["users.html", "items.html", "comprehensive.html"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    harness.configure()
+    import weasyprint
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    from services.pdf_service import pdf_service
+
+    css_path = os.path.join(pdf_service.template_dir, "reports", "report.css")
+
+    def uncached_setup():
+        env = Environment(loader=FileSystemLoader(pdf_service.template_dir), autoescape=select_autoescape(["html"]))
+        for name in TEMPLATES:
+            env.get_template(f"reports/{name}")
+            with open(css_path, encoding="utf-8") as f:
+                weasyprint.CSS(string=f.read())
+
+    def cached_setup():
+        for name in TEMPLATES:
+            pdf_service.env.get_template(f"reports/{name}")
+            pdf_service._load_stylesheets()
+
+    harness.print_results(f"Setup of the {len(TEMPLATES)} report types", {
+        "before: compile + parse per report": harness.measure(uncached_setup, repeat=args.repeat),
+        "after: cached environment": harness.measure(cached_setup, repeat=args.repeat),
+    })
+
+
+if __name__ == "__main__":
+    main()
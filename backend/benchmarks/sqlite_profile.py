@@ -0,0 +1,84 @@
+"""
+Concurrent read/write throughput of SQLite with SQLITE_PROFILE=default
+(rollback journal, full fsync per commit) and SQLITE_PROFILE=performance
+(WAL, synchronous=NORMAL and the other pragmas):
+
+    python -m benchmarks.sqlite_profile --writers 4 --readers 8 --seconds 10
+
+Writers commit one item per transaction, like POST /api/items/; readers
+page through items and count them, like the list endpoints. Each profile
+runs in a fresh process against its own database file.
+"""
+import argparse
+import threading
+import time
+
+from benchmarks import harness
+
+PROFILES = ["default", "performance"]
+
+
+def _workload(profile: str, writers: int, readers: int, seconds: float, seed_items: int, results):
+    harness.configure(SQLITE_PROFILE=profile)
+    from sqlalchemy import func, insert, select
+    from database import SessionLocal
+    import models
+
+    harness.create_schema()
+    harness.seed(users=100, items=seed_items)
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def run(operation, counter):
+        while not stop.is_set():
+            db = SessionLocal()
+            try:
+                operation(db)
+                outcome = counter
+            except Exception:
+                db.rollback()
+                outcome = "errors"
+            finally:
+                db.close()
+            with lock:
+                counts[outcome] += 1
+
+    def write(db):
+        db.execute(insert(models.Item).values(title="bench write", owner_id=1))
+        db.commit()
+
+    def read(db):
+        db.execute(select(models.Item.id, models.Item.title).order_by(models.Item.id.desc()).limit(50)).all()
+        db.scalar(select(func.count(models.Item.id)))
+
+    threads = [threading.Thread(target=run, args=(write, "writes")) for _ in range(writers)]
+    threads += [threading.Thread(target=run, args=(read, "reads")) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    results.put({name: count / seconds for name, count in counts.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed-items", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile")
+    print(f"{'profile':<14}{'writes/s':>12}{'reads/s':>12}{'errors/s':>12}")
+    for profile in PROFILES:
+        result = harness.run_in_process(
+            _workload, profile, args.writers, args.readers, args.seconds, args.seed_items
+        )
+        print(f"{profile:<14}{result['writes']:>12.0f}{result['reads']:>12.0f}{result['errors']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,32 @@ from typing import List
 class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # Serve the items, users and contact APIs through AsyncSession
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+    # Defaults to DATABASE_URL with its async driver (aiosqlite, asyncpg, aiomysql)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    # Comma-separated read replica URLs for read-only endpoints; empty reads from DATABASE_URL
+    DATABASE_REPLICA_URLS: List[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    # After a write, the client reads from the primary for this long (replication lag budget)
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    
+    # SQLite connection profile: "performance" (WAL, synchronous=NORMAL and
+    # the cache settings below) or "default" to keep SQLite's own pragmas
+    SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "performance")
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+    # Negative values are KiB, so the default is a 64 MiB page cache per connection
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    
+    # Connection pool (per process; in-memory SQLite keeps a single connection)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Seconds after which connections are replaced; -1 never recycles
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
     
     # CORS
     CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "http://localhost:8080").split(",")
@@ -15,6 +41,60 @@ class Settings:
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
     
+    # Access log ingestion
+    ACCESS_LOG_BATCH_SIZE: int = int(os.getenv("ACCESS_LOG_BATCH_SIZE", "500"))
+    ACCESS_LOG_FLUSH_INTERVAL: float = float(os.getenv("ACCESS_LOG_FLUSH_INTERVAL", "1.0"))
+    ACCESS_LOG_MAX_QUEUE_SIZE: int = int(os.getenv("ACCESS_LOG_MAX_QUEUE_SIZE", "100000"))
+    ACCESS_LOG_BULK_MAX_RECORDS: int = int(os.getenv("ACCESS_LOG_BULK_MAX_RECORDS", "50000"))
+    # Retries of a batch that failed with a locked database or lost connection
+    ACCESS_LOG_WRITE_RETRIES: int = int(os.getenv("ACCESS_LOG_WRITE_RETRIES", "3"))
+    # Closed months kept in partitions; 0 keeps everything
+    ACCESS_LOG_RETENTION_MONTHS: int = int(os.getenv("ACCESS_LOG_RETENTION_MONTHS", "0"))
+    # Expired partitions are archived here before being dropped; empty disables archiving
+    ACCESS_LOG_ARCHIVE_DIR: str = os.getenv("ACCESS_LOG_ARCHIVE_DIR", "./archive/access_logs")
+    
+    # Owner of created items until there is authentication (services/owners.py)
+    DEFAULT_OWNER_USERNAME: str = os.getenv("DEFAULT_OWNER_USERNAME", "default_user")
+    DEFAULT_OWNER_EMAIL: str = os.getenv("DEFAULT_OWNER_EMAIL", "default@example.com")
+    
+    # Batch create/update/delete endpoints (/api/items/batch, /api/users/batch)
+    BATCH_MAX_ROWS: int = int(os.getenv("BATCH_MAX_ROWS", "50000"))
+    # Seconds a batch response is kept for retries with the same Idempotency-Key
+    IDEMPOTENCY_KEY_TTL: float = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+    
+    # Background PDF report jobs
+    REPORT_JOB_CONCURRENCY: int = int(os.getenv("REPORT_JOB_CONCURRENCY", "2"))
+    REPORT_JOB_TIMEOUT: float = float(os.getenv("REPORT_JOB_TIMEOUT", "300"))
+    REPORT_JOB_POLL_INTERVAL: float = float(os.getenv("REPORT_JOB_POLL_INTERVAL", "1.0"))
+    # Seconds finished jobs and their PDFs are kept; 0 keeps them forever
+    REPORT_JOB_RETENTION: float = float(os.getenv("REPORT_JOB_RETENTION", "86400"))
+    REPORT_OUTPUT_DIR: str = os.getenv("REPORT_OUTPUT_DIR", "./generated_reports")
+    REPORT_CACHE_DIR: str = os.getenv("REPORT_CACHE_DIR", "./report_cache")
+    REPORT_CACHE_MAX_BYTES: int = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    # Reports with more rows than this are rendered in chunks and merged
+    REPORT_CHUNK_SIZE: int = int(os.getenv("REPORT_CHUNK_SIZE", "5000"))
+    # Processes rendering chunks in parallel per web worker; 0 splits the
+    # CPUs between the WEB_CONCURRENCY workers
+    REPORT_RENDER_WORKERS: int = int(os.getenv("REPORT_RENDER_WORKERS", "0"))
+    
+    # Create missing tables and check indexes when the app starts; the
+    # production launcher and "manage.py init-db" do this once instead
+    DB_AUTO_INIT: bool = os.getenv("DB_AUTO_INIT", "true").lower() in ("1", "true", "yes")
+    
+    # Production server (python run.py, see gunicorn.conf.py)
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    # Worker processes; 0 uses one per CPU
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    KEEPALIVE: int = int(os.getenv("KEEPALIVE", "5"))
+    BACKLOG: int = int(os.getenv("BACKLOG", "2048"))
+    # Seconds a stopping worker gets to finish in-flight requests
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    
+    # Response cache for aggregate endpoints (seconds)
+    CACHE_TTL: float = float(os.getenv("CACHE_TTL", "10"))
+    CACHE_STALE_TTL: float = float(os.getenv("CACHE_STALE_TTL", "30"))
+    
     class Config:
         case_sensitive = True
 
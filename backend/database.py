@@ -1,19 +1,167 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from config import settings
+from db_pool import engine_options
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def sqlite_pragmas(url: str) -> list:
+    """PRAGMA statements run on every new connection to a SQLite database"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or settings.SQLITE_PROFILE != "performance":
+        return []
+    pragmas = [
+        # Writers no longer block readers; a commit appends to the WAL
+        # instead of rewriting pages through the rollback journal
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if parsed.database not in (None, "", ":memory:"):
+        pragmas.insert(0, "PRAGMA journal_mode=WAL")
+    return pragmas
+
+def configure_sqlite(engine, url: str):
+    """Apply the SQLite performance profile to each connection the engine opens"""
+    pragmas = sqlite_pragmas(url)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+configure_sqlite(engine, settings.DATABASE_URL)
+
+replica_engines = []
+for replica_url in settings.DATABASE_REPLICA_URLS:
+    replica_engine = create_engine(replica_url, **engine_options(replica_url))
+    configure_sqlite(replica_engine, replica_url)
+    replica_engines.append(replica_engine)
+_replica_cycle = itertools.cycle(replica_engines)
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica stored in info["replica"], if any.
+    
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary,
+    and a session that has written stays on the primary from then on.
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info.pop("replica", None)
+        replica = self.info.get("replica")
+        if replica is not None:
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+def ReadSessionLocal() -> Session:
+    """Session for read-only work, bound to the next replica when any are configured"""
+    db = SessionLocal()
+    if replica_engines:
+        db.info["replica"] = next(_replica_cycle)
+    return db
+
+# Clients that wrote within READ_YOUR_WRITES_SECONDS carry this cookie and
+# keep reading from the primary until the replicas have caught up
+PRIMARY_COOKIE = "db_primary_until"
+
+# Async drivers used when DATABASE_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver"""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{dialect}' databases")
+    return ASYNC_DRIVERS[dialect] + sep + rest
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    # Imported lazily so the async drivers stay optional
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    configure_sqlite(async_engine.sync_engine, async_url)
+    # Objects stay loaded after commit, since lazy loads can't run in async code
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
+# Dependency to get DB session (primary); used by endpoints that write
+def get_db(request: Request, response: Response):
+    if replica_engines and request.method not in ("GET", "HEAD", "OPTIONS"):
+        until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            PRIMARY_COOKIE, f"{until:.3f}",
+            max_age=int(settings.READ_YOUR_WRITES_SECONDS) + 1, httponly=True, samesite="lax"
+        )
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def _wrote_recently(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+# Dependency to get a DB session for read-only endpoints (replica when possible)
+def get_read_db(request: Request):
+    db = SessionLocal() if _wrote_recently(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an async DB session (DATABASE_ASYNC only)
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("The async database layer is disabled, set DATABASE_ASYNC=true")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def init_db():
+    """Create missing tables, report index problems and seed the default owner; run once per deployment"""
+    import logging
+    import models  # registers the tables on Base.metadata
+    from services.index_advisor import log_index_report
+    from services.owners import get_owner_resolver
+
+    logger = logging.getLogger(__name__)
+    try:
+        Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.error(f"Failed to create database tables: {e}")
+        return
+    # Warn about indexes the query patterns need but the database lacks
+    log_index_report(engine)
+    # Seed the default owner now so item creation never has to
+    try:
+        get_owner_resolver().prepare()
+    except Exception as e:
+        logger.error(f"Failed to prepare the owner resolver: {e}")
\ No newline at end of file
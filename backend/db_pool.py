@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config import settings
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class _WaitInstrumentation:
+    """Records how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self._wait_sum = 0.0
+        self._checkouts = 0
+        self._timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            bucket = next((i for i, bound in enumerate(WAIT_BUCKETS) if waited <= bound), len(WAIT_BUCKETS))
+            with self._stats_lock:
+                self._wait_buckets[bucket] += 1
+                self._wait_sum += waited
+                self._checkouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Live pool usage plus the cumulative checkout wait histogram"""
+        with self._stats_lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(WAIT_BUCKETS + (float("inf"),), self._wait_buckets):
+                cumulative += count
+                histogram["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            return {
+                "pool_size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "checkouts_total": self._checkouts,
+                "timeouts_total": self._timeouts,
+                "wait_seconds_sum": round(self._wait_sum, 6),
+                "wait_seconds_buckets": histogram,
+            }
+
+
+class InstrumentedQueuePool(_WaitInstrumentation, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitInstrumentation, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine keyword arguments for `url` from the DB_POOL_* settings"""
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if not is_async:
+            # Connections are shared with the threadpool running sync routes
+            options["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; keep SQLAlchemy's pool
+            return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Stats of an engine's pool, or its status line for uninstrumented pools"""
+    pool = engine.pool
+    if isinstance(pool, _WaitInstrumentation):
+        return pool.stats()
+    return {"status": pool.status()}
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the production server started by run.py.
+
+run.py creates tables and checks indexes once before gunicorn starts.
+The app is preloaded in the master process and workers are forked from
+it; background services (access log buffer, report jobs) start in each
+worker's lifespan.
+"""
+import multiprocessing
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WEB_CONCURRENCY or multiprocessing.cpu_count()
+worker_class = "uvicorn_worker.UvloopWorker"
+preload_app = True
+keepalive = settings.KEEPALIVE
+backlog = settings.BACKLOG
+graceful_timeout = settings.GRACEFUL_TIMEOUT
+timeout = 120
+accesslog = "-"
+loglevel = "info"
+
+
+def post_fork(server, worker):
+    # Connections opened by the preloading master must not be shared
+    # with the workers; each worker opens its own
+    from database import engine, replica_engines
+
+    for db_engine in [engine, *replica_engines]:
+        db_engine.dispose(close=False)
\ No newline at end of file
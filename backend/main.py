@@ -1,8 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
-from database import engine, Base
-from routers import items, users, reports, contact, dashboard
+from database import async_engine, init_db
+from routers import items, users, reports, contact, dashboard, metrics, exports
+from routers import async_items, async_users, async_contact
+from services.access_log_buffer import access_log_buffer
+from services.report_jobs import report_job_queue
+from services.pdf_service import pdf_service
 from config import settings
 import logging
 import os
@@ -19,17 +25,28 @@ logger.info(f"DATABASE_URL: {settings.DATABASE_URL}")
 logger.info(f"CORS_ORIGINS: {settings.CORS_ORIGINS}")
 logger.info(f"Current working directory: {os.getcwd()}")
 
-# Create database tables
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
-except Exception as e:
-    logger.error(f"Failed to create database tables: {e}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup runs here instead of at import time; the production
+    # launcher runs it once before starting workers (DB_AUTO_INIT=false)
+    if settings.DB_AUTO_INIT:
+        init_db()
+    access_log_buffer.start()
+    report_job_queue.start()
+    yield
+    # Flush buffered access events before the worker exits
+    access_log_buffer.stop()
+    report_job_queue.stop()
+    pdf_service.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="A boilerplate for FastAPI backend with Vue frontend",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -39,14 +56,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link"],
 )
 
-# Include routers
+# Include routers; DATABASE_ASYNC swaps in the AsyncSession versions of the CRUD routers
+if settings.DATABASE_ASYNC:
+    items, users, contact = async_items, async_users, async_contact
 app.include_router(items.router, prefix="/api/items", tags=["items"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 app.include_router(contact.router, prefix="/api/contact", tags=["contact"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the FastAPI backend
+
+Usage:
+    python manage.py init-db
+    python manage.py rebuild-rollups
+    python manage.py check-indexes [--apply]
+    python manage.py rotate-access-logs [--retention-months N]
+"""
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from database import SessionLocal, engine, Base
+import models
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("manage")
+
+
+def init_db(args):
+    """Create missing tables and report index problems"""
+    from database import init_db as run_init
+
+    run_init()
+
+
+def rebuild_rollups(args):
+    """Backfill the dashboard rollup tables from existing access log rows"""
+    from services.access_rollups import rebuild_access_rollups
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        processed = rebuild_access_rollups(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt access rollups from {processed} access log rows")
+
+
+def check_indexes(args):
+    """Check that the routers' query patterns are served by database indexes"""
+    from services.index_advisor import apply_index_fixes, check_indexes as run_check
+
+    Base.metadata.create_all(bind=engine)
+    report = run_check(engine)
+    for line in report.lines():
+        print(line)
+    if report.ok:
+        print("All query patterns are covered by existing indexes")
+        return
+    if args.apply:
+        apply_index_fixes(engine, report)
+        print("Created missing indexes and dropped retired ones")
+    else:
+        raise SystemExit(1)
+
+
+def rotate_access_logs(args):
+    """Move closed months into partitions, then archive and drop expired partitions"""
+    from config import settings
+    from services.access_partitions import apply_retention, rotate_access_logs as rotate
+
+    Base.metadata.create_all(bind=engine)
+    retention = settings.ACCESS_LOG_RETENTION_MONTHS if args.retention_months is None else args.retention_months
+    db = SessionLocal()
+    try:
+        rotated = rotate(db)
+        db.commit()
+        expired = apply_retention(db, retention, settings.ACCESS_LOG_ARCHIVE_DIR or None)
+    finally:
+        db.close()
+    print(f"Rotated partitions: {', '.join(rotated) or 'none'}")
+    print(f"Dropped partitions: {', '.join(expired) or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend maintenance commands")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    subcommands.add_parser(
+        "init-db", help=init_db.__doc__
+    ).set_defaults(func=init_db)
+
+    subcommands.add_parser(
+        "rebuild-rollups", help=rebuild_rollups.__doc__
+    ).set_defaults(func=rebuild_rollups)
+
+    check_parser = subcommands.add_parser("check-indexes", help=check_indexes.__doc__)
+    check_parser.add_argument(
+        "--apply", action="store_true",
+        help="create missing indexes and drop retired ones"
+    )
+    check_parser.set_defaults(func=check_indexes)
+
+    rotate_parser = subcommands.add_parser("rotate-access-logs", help=rotate_access_logs.__doc__)
+    rotate_parser.add_argument(
+        "--retention-months", type=int, default=None,
+        help="closed months to keep (default: ACCESS_LOG_RETENTION_MONTHS, 0 keeps all)"
+    )
+    rotate_parser.set_defaults(func=rotate_access_logs)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
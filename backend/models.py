@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -20,7 +20,7 @@ class Item(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), index=True, nullable=False)
-    description = Column(String(500), index=True)
+    description = Column(String(500))
     completed = Column(Boolean, default=False)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
@@ -41,6 +41,14 @@ class Contact(Base):
 
 class UserAccess(Base):
     __tablename__ = "user_access"
+    __table_args__ = (
+        # Recent-access listing and the keyset cursor: ORDER BY access_time DESC, id DESC
+        Index("ix_user_access_access_time_id", "access_time", "id"),
+        # Per-user history: WHERE user_id = ? ORDER BY access_time DESC, id DESC
+        Index("ix_user_access_user_id_access_time_id", "user_id", "access_time", "id"),
+        # Ids must never be reused once old rows are rotated into partitions
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -52,4 +60,62 @@ class UserAccess(Base):
     status_code = Column(Integer)
     
     # Relationship with user
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+class AccessCounter(Base):
+    """All-time access counts per dimension value (endpoint, method, status, total)"""
+    __tablename__ = "access_counters"
+    __table_args__ = (
+        UniqueConstraint("dimension", "key", name="uq_access_counters_dimension_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    dimension = Column(String(20), nullable=False)
+    key = Column(String(200), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class AccessHourlyRollup(Base):
+    """Access counts per dimension value and hour bucket"""
+    __tablename__ = "access_hourly_rollups"
+    __table_args__ = (
+        UniqueConstraint("bucket", "dimension", "key", name="uq_access_hourly_bucket_dimension_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bucket = Column(DateTime, nullable=False)
+    dimension = Column(String(20), nullable=False)
+    key = Column(String(200), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    id = Column(String(32), primary_key=True)
+    report_type = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    error = Column(String(1000))
+    file_path = Column(String(500))
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class IdempotencyKey(Base):
+    """Response of a batch request, replayed when it is retried with the same key"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(50), nullable=False)
+    key = Column(String(200), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+class DataVersion(Base):
+    """Change counter per table, bumped in the same transaction as each write"""
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
\ No newline at end of file
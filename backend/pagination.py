@@ -0,0 +1,106 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise _invalid_cursor()
+    if not isinstance(values, dict):
+        raise _invalid_cursor()
+    return values
+
+
+def _cursor_id(values: Dict[str, Any]) -> int:
+    try:
+        return int(values["id"])
+    except (KeyError, TypeError, ValueError):
+        raise _invalid_cursor()
+
+
+def set_next_cursor(request: Request, response: Response, next_cursor: Optional[str]):
+    """Expose the next page as X-Next-Cursor and an RFC 8288 Link header"""
+    if not next_cursor:
+        return
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+
+def page_rows(rows: List[Any], limit: int) -> Tuple[List[Any], bool]:
+    # One extra row is fetched to learn whether another page exists
+    return rows[:limit], len(rows) > limit
+
+
+def _page_by_id(query, id_column, cursor: Optional[str], skip: int, limit: int):
+    # Works for ORM queries and Core selects alike
+    query = query.order_by(id_column)
+    if cursor:
+        query = query.filter(id_column > _cursor_id(decode_cursor(cursor)))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def paginate_by_id(query, id_column, cursor: Optional[str], skip: int, limit: int):
+    """
+    Page through `query` in ascending id order.
+
+    With a cursor, rows after the cursor's id are fetched through the
+    primary key index; without one, the legacy `skip` offset is applied.
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    rows, has_more = page_rows(_page_by_id(query, id_column, cursor, skip, limit).all(), limit)
+    next_cursor = encode_cursor({"id": rows[-1].id}) if has_more and rows else None
+    return rows, next_cursor
+
+
+def paginate_rows_by_id(db, stmt, id_column, cursor: Optional[str], skip: int, limit: int):
+    """Like paginate_by_id for a Core select, returning the rows as plain dicts"""
+    result = db.execute(_page_by_id(stmt, id_column, cursor, skip, limit))
+    rows, has_more = page_rows(result.mappings().all(), limit)
+    next_cursor = encode_cursor({"id": rows[-1]["id"]}) if has_more and rows else None
+    return [dict(row) for row in rows], next_cursor
+
+
+def encode_time_cursor(last_time: Union[datetime, str], last_id: int) -> str:
+    """
+    Cursor for listings ordered newest first on (time, id).
+
+    `last_time` is the value as the database stores it: a datetime, or the
+    raw text of a SQLite column, which is kept verbatim so the next page
+    compares against exactly what is stored.
+    """
+    if isinstance(last_time, str):
+        return encode_cursor({"s": last_time, "id": last_id})
+    return encode_cursor({"t": last_time.isoformat(), "id": last_id})
+
+
+def decode_time_cursor(cursor: str) -> Tuple[Union[datetime, str], int]:
+    values = decode_cursor(cursor)
+    last_id = _cursor_id(values)
+    if isinstance(values.get("s"), str):
+        return values["s"], last_id
+    try:
+        return datetime.fromisoformat(values["t"]), last_id
+    except (KeyError, TypeError, ValueError):
+        raise _invalid_cursor()
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db
+from pagination import paginate_rows_by_id
+import models, schemas
+from serialization import rows_response, schema_columns
+from services import cache
+from services.cache import response_cache
+
+# AsyncSession version of routers/contact.py, mounted when DATABASE_ASYNC is set
+router = APIRouter()
+
+async def _get_contact(db: AsyncSession, contact_id: int) -> models.Contact:
+    db_contact = await db.get(models.Contact, contact_id)
+    if db_contact is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contact not found"
+        )
+    return db_contact
+
+@router.get("/", response_model=List[schemas.Contact])
+async def read_contacts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    contacts, next_cursor = await db.run_sync(
+        lambda session: paginate_rows_by_id(
+            session, select(*schema_columns(models.Contact, schemas.Contact)), models.Contact.id, cursor, skip, limit
+        )
+    )
+    return rows_response(request, contacts, next_cursor)
+
+@router.post("/", response_model=schemas.Contact)
+async def create_contact(contact: schemas.ContactCreate, db: AsyncSession = Depends(get_async_db)):
+    db_contact = models.Contact(**contact.model_dump())
+    db.add(db_contact)
+    await db.commit()
+    response_cache.invalidate(cache.CONTACTS)
+    await db.refresh(db_contact)
+    return db_contact
+
+@router.get("/{contact_id}", response_model=schemas.Contact)
+async def read_contact(contact_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _get_contact(db, contact_id)
+
+@router.put("/{contact_id}", response_model=schemas.Contact)
+async def update_contact(contact_id: int, contact_update: dict, db: AsyncSession = Depends(get_async_db)):
+    db_contact = await _get_contact(db, contact_id)
+    
+    for key, value in contact_update.items():
+        setattr(db_contact, key, value)
+    
+    await db.commit()
+    response_cache.invalidate(cache.CONTACTS)
+    await db.refresh(db_contact)
+    return db_contact
+
+@router.delete("/{contact_id}")
+async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_contact = await _get_contact(db, contact_id)
+    
+    await db.delete(db_contact)
+    await db.commit()
+    response_cache.invalidate(cache.CONTACTS)
+    return {"message": "Contact deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request, Response
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db
+from pagination import paginate_rows_by_id
+import models, schemas
+from serialization import batch_response, insert_returning, rows_response, schema_columns
+from services import cache
+from services.batch import BatchRejected, apply_item_batch, run_batch
+from services.cache import response_cache
+from services.owners import current_owner_id
+from services.report_cache import bump_data_version
+
+# AsyncSession version of routers/items.py, mounted when DATABASE_ASYNC is set
+router = APIRouter()
+
+async def _get_item(db: AsyncSession, item_id: int) -> models.Item:
+    db_item = await db.get(models.Item, item_id)
+    if db_item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found"
+        )
+    return db_item
+
+@router.get("/", response_model=List[schemas.Item])
+async def read_items(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    items, next_cursor = await db.run_sync(
+        lambda session: paginate_rows_by_id(
+            session, select(*schema_columns(models.Item, schemas.Item)), models.Item.id, cursor, skip, limit
+        )
+    )
+    return rows_response(request, items, next_cursor)
+
+@router.post("/", response_model=schemas.Item, status_code=status.HTTP_201_CREATED)
+async def create_item(
+    item: schemas.ItemCreate,
+    owner_id: int = Depends(current_owner_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # A single INSERT ... RETURNING (see routers/items.py)
+    db_item = await db.run_sync(
+        insert_returning,
+        insert(models.Item).values(**item.model_dump(), owner_id=owner_id), models.Item, schemas.Item
+    )
+    await db.commit()
+    response_cache.invalidate(cache.ITEMS)
+    return db_item
+
+@router.get("/{item_id}", response_model=schemas.Item)
+async def read_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _get_item(db, item_id)
+
+@router.put("/{item_id}", response_model=schemas.Item)
+async def update_item(item_id: int, item: schemas.ItemUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_item = await _get_item(db, item_id)
+    
+    update_data = item.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_item, field, value)
+    
+    await db.run_sync(bump_data_version, models.Item)
+    await db.commit()
+    response_cache.invalidate(cache.ITEMS)
+    await db.refresh(db_item)
+    return db_item
+
+@router.delete("/{item_id}")
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_item = await _get_item(db, item_id)
+    
+    await db.delete(db_item)
+    await db.run_sync(bump_data_version, models.Item)
+    await db.commit()
+    response_cache.invalidate(cache.ITEMS)
+    return {"message": "Item deleted successfully"}
+
+@router.post("/batch", response_model=schemas.BatchResult)
+async def batch_items(
+    response: Response,
+    batch: schemas.ItemBatch,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+    owner_id: int = Depends(current_owner_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create, update and delete items in one transaction, with per-row results"""
+    try:
+        body, replayed = await db.run_sync(
+            run_batch, "items", batch, apply_item_batch, idempotency_key, owner_id=owner_id
+        )
+    except BatchRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e)
+        )
+    return batch_response(body, replayed, response)
\ No newline at end of file
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db
+from pagination import paginate_rows_by_id
+import models, schemas
+from serialization import batch_response, insert_returning, rows_response, schema_columns
+from services import cache
+from services.batch import BatchRejected, apply_user_batch, run_batch
+from services.cache import response_cache
+from services.users import duplicate_message, duplicate_user_message, insert_user, taken_emails
+
+# AsyncSession version of routers/users.py, mounted when DATABASE_ASYNC is set
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.User])
+async def read_users(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    users, next_cursor = await db.run_sync(
+        lambda session: paginate_rows_by_id(
+            session, select(*schema_columns(models.User, schemas.User)), models.User.id, cursor, skip, limit
+        )
+    )
+    return rows_response(request, users, next_cursor)
+
+@router.post("/", response_model=schemas.User)
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # One INSERT, duplicates caught by the unique indexes (see routers/users.py).
+    # On SQLite duplicates are skipped instead of raising: SQLAlchemy's
+    # aiosqlite adapter leaks the cursor of a failed statement, and
+    # finalizing it later can block the event loop on a busy connection
+    skip_duplicates = db.bind.dialect.name == "sqlite"
+    try:
+        db_user = await db.run_sync(
+            insert_returning, insert_user(user, skip_duplicates=skip_duplicates), models.User, schemas.User
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        message = duplicate_user_message(e)
+        if message is None:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
+        )
+    if db_user is None:
+        emails = (await db.scalars(taken_emails(user))).all()
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=duplicate_message(user, emails)
+        )
+    await db.commit()
+    response_cache.invalidate(cache.USERS)
+    return db_user
+
+@router.get("/{user_id}", response_model=schemas.User)
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.get(models.User, user_id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return db_user
+
+@router.post("/batch", response_model=schemas.BatchResult)
+async def batch_users(
+    response: Response,
+    batch: schemas.UserBatch,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create, update and delete users in one transaction, with per-row results"""
+    try:
+        body, replayed = await db.run_sync(
+            run_batch, "users", batch, apply_user_batch, idempotency_key
+        )
+    except BatchRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e)
+        )
+    return batch_response(body, replayed, response)
\ No newline at end of file
@@ -1,26 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_db, get_read_db
+from pagination import paginate_rows_by_id
 import models, schemas
+from serialization import rows_response, schema_columns
+from services import cache
+from services.cache import response_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Contact])
-def read_contacts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    contacts = db.query(models.Contact).offset(skip).limit(limit).all()
-    return contacts
+def read_contacts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    # Rows are projected to the schema's columns and returned without re-validation
+    contacts, next_cursor = paginate_rows_by_id(
+        db, select(*schema_columns(models.Contact, schemas.Contact)), models.Contact.id, cursor, skip, limit
+    )
+    return rows_response(request, contacts, next_cursor)
 
 @router.post("/", response_model=schemas.Contact)
 def create_contact(contact: schemas.ContactCreate, db: Session = Depends(get_db)):
     db_contact = models.Contact(**contact.model_dump())
     db.add(db_contact)
     db.commit()
+    response_cache.invalidate(cache.CONTACTS)
     db.refresh(db_contact)
     return db_contact
 
 @router.get("/{contact_id}", response_model=schemas.Contact)
-def read_contact(contact_id: int, db: Session = Depends(get_db)):
+def read_contact(contact_id: int, db: Session = Depends(get_read_db)):
     db_contact = db.query(models.Contact).filter(models.Contact.id == contact_id).first()
     if db_contact is None:
         raise HTTPException(
@@ -42,6 +57,7 @@ def update_contact(contact_id: int, contact_update: dict, db: Session = Depends(
         setattr(db_contact, key, value)
     
     db.commit()
+    response_cache.invalidate(cache.CONTACTS)
     db.refresh(db_contact)
     return db_contact
 
@@ -56,4 +72,5 @@ def delete_contact(contact_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_contact)
     db.commit()
+    response_cache.invalidate(cache.CONTACTS)
     return {"message": "Contact deleted successfully"}
\ No newline at end of file
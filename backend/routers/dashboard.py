@@ -1,20 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, case, delete, null, select, true
 from typing import List, Optional
 from datetime import datetime, timedelta
-from database import get_db
+from pydantic import TypeAdapter, ValidationError
+from database import get_db, get_read_db, ReadSessionLocal
+from serialization import rows_response
+from config import settings
 import models, schemas
+from services.access_log_buffer import access_log_buffer, write_access_logs
+from services import cache
+from services.cache import response_cache
+from services.access_rollups import (
+    read_breakdowns, recent_count_query, record_access_rollups
+)
+from services.access_partitions import find_access_log, paginate_access_logs
+import json
 
 router = APIRouter()
 
-@router.post("/log-access", response_model=schemas.UserAccess)
+_access_batch_adapter = TypeAdapter(List[schemas.UserAccessCreate])
+
+@router.post(
+    "/log-access",
+    response_model=schemas.AccessLogAck,
+    status_code=status.HTTP_202_ACCEPTED
+)
 def log_user_access(
     access_data: schemas.UserAccessCreate,
-    request: Request,
-    db: Session = Depends(get_db)
+    request: Request
 ):
-    """Log user access to the system"""
+    """Queue a user access event; it is written to the database in batches"""
     # Extract additional information from request if not provided
     if not access_data.ip_address:
         access_data.ip_address = request.client.host
@@ -22,138 +38,191 @@ def log_user_access(
     if not access_data.user_agent:
         access_data.user_agent = request.headers.get("user-agent", "")
     
-    db_access = models.UserAccess(**access_data.model_dump())
-    db.add(db_access)
-    db.commit()
-    db.refresh(db_access)
-    return db_access
+    if not access_log_buffer.enqueue(access_data):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Access log queue is full, retry later"
+        )
+    return schemas.AccessLogAck(
+        status="queued",
+        queued=1,
+        queue_depth=access_log_buffer.depth
+    )
 
-@router.get("/stats", response_model=schemas.DashboardStats)
-def get_dashboard_stats(db: Session = Depends(get_db)):
-    """Get comprehensive dashboard statistics"""
-    
-    # User statistics
-    total_users = db.query(models.User).count()
-    active_users = db.query(models.User).filter(models.User.is_active == True).count()
-    
-    # Contact statistics
-    total_contacts = db.query(models.Contact).count()
-    unresolved_contacts = db.query(models.Contact).filter(models.Contact.is_resolved == False).count()
+async def parse_access_batch(request: Request) -> List[schemas.UserAccessCreate]:
+    """Parse a JSON array or newline-delimited JSON body into access records"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            payload = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            payload = json.loads(body or b"[]")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed JSON body: {e}"
+        )
     
-    # Item statistics
-    total_items = db.query(models.Item).count()
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a JSON array or newline-delimited JSON records"
+        )
+    if len(payload) > settings.ACCESS_LOG_BULK_MAX_RECORDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.ACCESS_LOG_BULK_MAX_RECORDS} records"
+        )
     
-    # Recent access (last 7 days)
+    try:
+        return _access_batch_adapter.validate_python(payload)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False)
+        )
+
+@router.post(
+    "/log-access/bulk",
+    response_model=schemas.BulkAccessLogResult,
+    status_code=status.HTTP_201_CREATED
+)
+def log_user_access_bulk(
+    records: List[schemas.UserAccessCreate] = Depends(parse_access_batch),
+    db: Session = Depends(get_db)
+):
+    """Insert a batch of access events in a single transaction"""
+    now = datetime.utcnow()
+    rows = [dict(record.model_dump(), access_time=now) for record in records]
+    inserted = write_access_logs(db, rows)
+    db.commit()
+    response_cache.invalidate(cache.ACCESS_LOG)
+    return schemas.BulkAccessLogResult(inserted=inserted)
+
+@router.get("/stats", response_model=schemas.DashboardStats)
+def get_dashboard_stats():
+    """
+    Get comprehensive dashboard statistics (cached, see CACHE_TTL)
+
+    Writes handled by this worker invalidate the cache immediately. With
+    several workers, the others can serve stats up to CACHE_TTL +
+    CACHE_STALE_TTL seconds old.
+    """
+    return response_cache.get_or_compute(
+        "dashboard:stats",
+        _load_dashboard_stats,
+        tags=(cache.USERS, cache.ITEMS, cache.CONTACTS, cache.ACCESS_LOG)
+    )
+
+def _load_dashboard_stats() -> schemas.DashboardStats:
+    # Uses its own session so stale entries can be refreshed in the background
+    db = ReadSessionLocal()
+    try:
+        return compute_dashboard_stats(db)
+    finally:
+        db.close()
+
+def compute_dashboard_stats(db: Session) -> schemas.DashboardStats:
+    """
+    Compute dashboard statistics from the database in two queries.
+
+    The counters come from one SELECT that aggregates each table once with
+    conditional sums, and the endpoint/method/status breakdowns from one
+    read of the rollup counters.
+    """
+    user_counts = select(
+        func.count(models.User.id).label("total"),
+        func.coalesce(func.sum(case((models.User.is_active == True, 1), else_=0)), 0).label("active")
+    ).subquery()
+    contact_counts = select(
+        func.count(models.Contact.id).label("total"),
+        func.coalesce(func.sum(case((models.Contact.is_resolved == False, 1), else_=0)), 0).label("unresolved")
+    ).subquery()
+    item_counts = select(func.count(models.Item.id).label("total")).subquery()
+    
+    # Recent access (last 7 days) comes from the hourly rollups
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_access_count = db.query(models.UserAccess).filter(
-        models.UserAccess.access_time >= seven_days_ago
-    ).count()
-    
-    # Access by endpoint
-    access_by_endpoint = db.query(
-        models.UserAccess.endpoint,
-        func.count(models.UserAccess.id).label('count')
-    ).filter(
-        models.UserAccess.endpoint.isnot(None)
-    ).group_by(models.UserAccess.endpoint).all()
     
-    endpoint_stats = {item.endpoint: item.count for item in access_by_endpoint}
-    
-    # Access by method
-    access_by_method = db.query(
-        models.UserAccess.method,
-        func.count(models.UserAccess.id).label('count')
-    ).filter(
-        models.UserAccess.method.isnot(None)
-    ).group_by(models.UserAccess.method).all()
-    
-    method_stats = {item.method: item.count for item in access_by_method}
-    
-    # Access by status code
-    access_by_status = db.query(
-        models.UserAccess.status_code,
-        func.count(models.UserAccess.id).label('count')
-    ).filter(
-        models.UserAccess.status_code.isnot(None)
-    ).group_by(models.UserAccess.status_code).all()
-    
-    status_stats = {str(item.status_code): item.count for item in access_by_status}
+    counters = db.execute(
+        select(
+            user_counts.c.total,
+            user_counts.c.active,
+            contact_counts.c.total,
+            contact_counts.c.unresolved,
+            item_counts.c.total,
+            recent_count_query(seven_days_ago).scalar_subquery()
+        ).select_from(user_counts).join(contact_counts, true()).join(item_counts, true())
+    ).one()
+    breakdowns = read_breakdowns(db)
     
     return schemas.DashboardStats(
-        total_users=total_users,
-        active_users=active_users,
-        total_contacts=total_contacts,
-        unresolved_contacts=unresolved_contacts,
-        total_items=total_items,
-        recent_access_count=recent_access_count,
-        access_by_endpoint=endpoint_stats,
-        access_by_method=method_stats,
-        access_by_status=status_stats
+        total_users=counters[0],
+        active_users=counters[1],
+        total_contacts=counters[2],
+        unresolved_contacts=counters[3],
+        total_items=counters[4],
+        recent_access_count=counters[5],
+        access_by_endpoint=breakdowns["endpoint"],
+        access_by_method=breakdowns["method"],
+        access_by_status=breakdowns["status"]
     )
 
 @router.get("/recent-access", response_model=List[schemas.UserAccess])
 def get_recent_access(
-    skip: int = 0,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get recent user access logs"""
-    access_logs = db.query(
-        models.UserAccess,
-        models.User.username,
-        models.User.email
-    ).join(
-        models.User,
-        models.UserAccess.user_id == models.User.id,
-        isouter=True
-    ).order_by(
-        desc(models.UserAccess.access_time)
-    ).offset(skip).limit(limit).all()
+    """Get recent user access logs (pass the X-Next-Cursor value as `cursor` for the next page)"""
+    users = models.User.__table__
+    
+    def build_select(table):
+        return select(
+            table, users.c.username, users.c.email
+        ).select_from(
+            table.outerjoin(users, table.c.user_id == users.c.id)
+        )
     
-    result = []
-    for access, username, email in access_logs:
-        access_dict = {
-            "id": access.id,
-            "user_id": access.user_id,
-            "access_time": access.access_time,
-            "ip_address": access.ip_address,
-            "user_agent": access.user_agent,
-            "endpoint": access.endpoint,
-            "method": access.method,
-            "status_code": access.status_code,
-            "username": username,
-            "email": email
-        }
-        result.append(schemas.UserAccess(**access_dict))
+    access_logs, next_cursor = paginate_access_logs(db, build_select, cursor, skip, limit)
     
-    return result
+    # The select yields exactly the UserAccess fields, so rows skip re-validation
+    return rows_response(request, access_logs, next_cursor)
 
 @router.get("/user-access/{user_id}", response_model=List[schemas.UserAccess])
 def get_user_access_history(
     user_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Get access history for a specific user"""
-    access_logs = db.query(models.UserAccess).filter(
-        models.UserAccess.user_id == user_id
-    ).order_by(
-        desc(models.UserAccess.access_time)
-    ).offset(skip).limit(limit).all()
+    access_logs, next_cursor = paginate_access_logs(
+        db,
+        lambda table: select(
+            table, null().label("username"), null().label("email")
+        ).where(table.c.user_id == user_id),
+        cursor, skip, limit
+    )
     
-    return access_logs
+    return rows_response(request, access_logs, next_cursor)
 
 @router.delete("/access/{access_id}")
 def delete_access_log(access_id: int, db: Session = Depends(get_db)):
-    """Delete a specific access log"""
-    db_access = db.query(models.UserAccess).filter(models.UserAccess.id == access_id).first()
+    """Delete a specific access log (from the hot table or a partition)"""
+    table, db_access = find_access_log(db, access_id)
     if db_access is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Access log not found"
         )
     
-    db.delete(db_access)
+    record_access_rollups(db, [dict(db_access._mapping)], sign=-1)
+    db.execute(delete(table).where(table.c.id == access_id))
     db.commit()
+    response_cache.invalidate(cache.ACCESS_LOG)
     return {"message": "Access log deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Callable, Iterator, List, Optional
+from datetime import datetime
+from database import ReadSessionLocal
+import models
+from services.access_partitions import access_log_tables
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Rows fetched from the database cursor per round trip
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _check_format(format: str):
+    if format not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{format}', use one of: {', '.join(MEDIA_TYPES)}"
+        )
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _stream_rows(build_selects: Callable[[Session], List], columns: List[str], format: str) -> Iterator[bytes]:
+    """
+    Yield the export body one batch of rows at a time.
+
+    The session is opened inside the generator so it stays alive for the
+    whole response, and rows are pulled from a server-side cursor with
+    yield_per so memory doesn't grow with the table size.
+    """
+    db = ReadSessionLocal()
+    try:
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+        for stmt in build_selects(db):
+            result = db.execute(
+                stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+            )
+            for batch in result.partitions():
+                if format == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    writer.writerows(batch)
+                    yield buffer.getvalue().encode()
+                else:
+                    yield "".join(
+                        json.dumps({c: _encode_value(v) for c, v in zip(columns, row)}) + "\n"
+                        for row in batch
+                    ).encode()
+    except Exception as e:
+        # Headers are already sent, so the best we can do is stop the stream
+        logger.error(f"Export failed mid-stream: {e}")
+        raise
+    finally:
+        db.close()
+
+def _export(name: str, build_selects, columns: List[str], format: str) -> StreamingResponse:
+    _check_format(format)
+    return StreamingResponse(
+        _stream_rows(build_selects, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename={name}.{format}"
+        }
+    )
+
+def _table_export(model, name: str, format: str) -> StreamingResponse:
+    table = model.__table__
+    columns = [c.name for c in table.columns]
+    return _export(
+        name,
+        lambda db: [select(table).order_by(table.c.id)],
+        columns,
+        format
+    )
+
+@router.get("/users")
+def export_users(format: str = "csv"):
+    """Stream all users as CSV or NDJSON"""
+    return _table_export(models.User, "users", format)
+
+@router.get("/items")
+def export_items(format: str = "csv"):
+    """Stream all items as CSV or NDJSON"""
+    return _table_export(models.Item, "items", format)
+
+@router.get("/contacts")
+def export_contacts(format: str = "csv"):
+    """Stream all contact messages as CSV or NDJSON"""
+    return _table_export(models.Contact, "contacts", format)
+
+@router.get("/access-logs")
+def export_access_logs(
+    format: str = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Stream access logs (hot table and partitions, newest first) as CSV or NDJSON"""
+    columns = [c.name for c in models.UserAccess.__table__.columns]
+
+    def build_selects(db):
+        selects = []
+        for table in access_log_tables(db, since=since):
+            stmt = select(*[table.c[c] for c in columns])
+            if since is not None:
+                stmt = stmt.where(table.c.access_time >= since)
+            if until is not None:
+                stmt = stmt.where(table.c.access_time < until)
+            selects.append(stmt.order_by(table.c.access_time.desc(), table.c.id.desc()))
+        return selects
+
+    return _export("access_logs", build_selects, columns, format)
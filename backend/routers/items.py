@@ -1,42 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request, Response
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_db, get_read_db
+from pagination import paginate_rows_by_id
 import models, schemas
+from serialization import batch_response, insert_returning, rows_response, schema_columns
+from services import cache
+from services.batch import BatchRejected, apply_item_batch, run_batch
+from services.cache import response_cache
+from services.owners import current_owner_id
+from services.report_cache import bump_data_version
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Item])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = db.query(models.Item).offset(skip).limit(limit).all()
-    return items
+def read_items(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    # Rows are projected to the schema's columns and returned without re-validation
+    items, next_cursor = paginate_rows_by_id(
+        db, select(*schema_columns(models.Item, schemas.Item)), models.Item.id, cursor, skip, limit
+    )
+    return rows_response(request, items, next_cursor)
 
 @router.post("/", response_model=schemas.Item, status_code=status.HTTP_201_CREATED)
-def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
-    # For now, use a default user (you should implement proper authentication)
-    default_owner_id = 1
-    
-    # Check if default user exists, if not create it
-    db_user = db.query(models.User).filter(models.User.id == default_owner_id).first()
-    if not db_user:
-        # Create a default user if it doesn't exist
-        default_user = models.User(
-            username="default_user",
-            email="default@example.com"
-        )
-        db.add(default_user)
-        db.commit()
-        db.refresh(default_user)
-        default_owner_id = default_user.id
-    
-    db_item = models.Item(**item.model_dump(), owner_id=default_owner_id)
-    db.add(db_item)
+def create_item(
+    item: schemas.ItemCreate,
+    owner_id: int = Depends(current_owner_id),
+    db: Session = Depends(get_db)
+):
+    # A single INSERT ... RETURNING; the new row changes the count and
+    # max(id) that report fingerprints include, so no version bump is needed
+    db_item = insert_returning(
+        db, insert(models.Item).values(**item.model_dump(), owner_id=owner_id), models.Item, schemas.Item
+    )
     db.commit()
-    db.refresh(db_item)
+    response_cache.invalidate(cache.ITEMS)
     return db_item
 
 @router.get("/{item_id}", response_model=schemas.Item)
-def read_item(item_id: int, db: Session = Depends(get_db)):
+def read_item(item_id: int, db: Session = Depends(get_read_db)):
     db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
     if db_item is None:
         raise HTTPException(
@@ -58,7 +66,9 @@ def update_item(item_id: int, item: schemas.ItemUpdate, db: Session = Depends(ge
     for field, value in update_data.items():
         setattr(db_item, field, value)
     
+    bump_data_version(db, models.Item)
     db.commit()
+    response_cache.invalidate(cache.ITEMS)
     db.refresh(db_item)
     return db_item
 
@@ -72,5 +82,27 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
         )
     
     db.delete(db_item)
+    bump_data_version(db, models.Item)
     db.commit()
-    return {"message": "Item deleted successfully"}
\ No newline at end of file
+    response_cache.invalidate(cache.ITEMS)
+    return {"message": "Item deleted successfully"}
+
+@router.post("/batch", response_model=schemas.BatchResult)
+def batch_items(
+    response: Response,
+    batch: schemas.ItemBatch,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+    owner_id: int = Depends(current_owner_id),
+    db: Session = Depends(get_db)
+):
+    """Create, update and delete items in one transaction, with per-row results"""
+    try:
+        body, replayed = run_batch(
+            db, "items", batch, apply_item_batch, idempotency_key, owner_id=owner_id
+        )
+    except BatchRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e)
+        )
+    return batch_response(body, replayed, response)
\ No newline at end of file
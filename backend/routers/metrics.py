@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from database import engine, async_engine, replica_engines
+from db_pool import pool_stats
+from services.access_log_buffer import access_log_buffer
+from services.cache import response_cache
+from services.report_jobs import report_job_queue
+from services.report_cache import report_cache
+
+router = APIRouter()
+
+def _db_pool_stats():
+    stats = {"sync": pool_stats(engine)}
+    if replica_engines:
+        stats["replicas"] = [pool_stats(replica) for replica in replica_engines]
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    return stats
+
+@router.get("/")
+def read_metrics():
+    """Runtime metrics for the backend's in-process subsystems"""
+    return {
+        "access_log": access_log_buffer.stats(),
+        "cache": response_cache.stats(),
+        "report_jobs": report_job_queue.stats(),
+        "report_cache": report_cache.stats(),
+        "db_pool": _db_pool_stats()
+    }
+
+@router.get("/access-log")
+def read_access_log_metrics():
+    """Access log ingestion queue depth and flush counters"""
+    return access_log_buffer.stats()
+
+@router.get("/cache")
+def read_cache_metrics():
+    """Response cache hit/miss counters"""
+    return response_cache.stats()
+
+
+@router.get("/db-pool")
+def read_db_pool_metrics():
+    """Connection pool usage and checkout wait histogram"""
+    return _db_pool_stats()
\ No newline at end of file
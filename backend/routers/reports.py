@@ -1,127 +1,161 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-import models
-from services.pdf_service import pdf_service
+from database import get_db, get_read_db
+import models, schemas
+from services.reports import (
+    DEFAULT_SUMMARY_SAMPLE, DETAIL_LEVELS, MAX_SUMMARY_SAMPLE, REPORT_TYPES,
+    NoReportData, cached_report, report_cache_key, report_variant
+)
+from services.report_jobs import report_job_queue, COMPLETED
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.get("/users", response_class=Response)
-async def generate_users_report(db: Session = Depends(get_db)):
-    """
-    Generate PDF report for all users
-    """
+def _check_detail(detail: str, sample: int):
+    if detail not in DETAIL_LEVELS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown detail level '{detail}', use one of: {', '.join(DETAIL_LEVELS)}"
+        )
+    if not 1 <= sample <= MAX_SUMMARY_SAMPLE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sample must be between 1 and {MAX_SUMMARY_SAMPLE}"
+        )
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: "*" or any listed tag, compared weakly (W/ ignored)"""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+def _pdf_report(request: Request, db: Session, report_type: str, detail: str, sample: int) -> Response:
+    # Plain `def` routes run in the threadpool, so rendering no longer
+    # blocks the event loop; large reports should use /jobs instead
+    _check_detail(detail, sample)
     try:
-        logger.info("Generating users PDF report")
-        
-        # Get all users from database
-        users = db.query(models.User).all()
-        
-        if not users:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No users found in the database"
-            )
-        
-        # Generate PDF
-        pdf_content = pdf_service.generate_users_report(users)
+        key = report_cache_key(db, report_type, detail, sample)
+        etag = f'"{key[:32]}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
         
-        logger.info(f"Users PDF report generated successfully for {len(users)} users")
+        logger.info(f"Generating {report_type} PDF report")
+        pdf_content = cached_report(db, report_type, key, detail, sample)
+        logger.info(f"{report_type.capitalize()} PDF report generated successfully")
         
         return Response(
             content=pdf_content,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": "attachment; filename=users_report.pdf"
+                "Content-Disposition": f"attachment; filename={report_variant(report_type, detail, sample)}_report.pdf",
+                **headers
             }
         )
         
+    except NoReportData as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
     except Exception as e:
-        logger.error(f"Error generating users report: {str(e)}")
+        logger.error(f"Error generating {report_type} report: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating report: {str(e)}"
         )
 
+@router.get("/users", response_class=Response)
+def generate_users_report(
+    request: Request,
+    detail: str = "full",
+    sample: int = DEFAULT_SUMMARY_SAMPLE,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Generate PDF report for all users
+    
+    With detail=summary only the totals and the `sample` most recent rows are rendered.
+    """
+    return _pdf_report(request, db, "users", detail, sample)
+
 @router.get("/items", response_class=Response)
-async def generate_items_report(db: Session = Depends(get_db)):
+def generate_items_report(
+    request: Request,
+    detail: str = "full",
+    sample: int = DEFAULT_SUMMARY_SAMPLE,
+    db: Session = Depends(get_read_db)
+):
     """
     Generate PDF report for all items
+    
+    With detail=summary only the totals and the `sample` most recent rows are rendered.
     """
-    try:
-        logger.info("Generating items PDF report")
-        
-        # Get all items from database
-        items = db.query(models.Item).all()
-        
-        if not items:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No items found in the database"
-            )
-        
-        # Generate PDF
-        pdf_content = pdf_service.generate_items_report(items)
-        
-        logger.info(f"Items PDF report generated successfully for {len(items)} items")
-        
-        return Response(
-            content=pdf_content,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": "attachment; filename=items_report.pdf"
-            }
+    return _pdf_report(request, db, "items", detail, sample)
+
+@router.get("/comprehensive", response_class=Response)
+def generate_comprehensive_report(
+    request: Request,
+    detail: str = "full",
+    sample: int = DEFAULT_SUMMARY_SAMPLE,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Generate comprehensive PDF report with both users and items
+    
+    With detail=summary only the totals and the `sample` most recent rows are rendered.
+    """
+    return _pdf_report(request, db, "comprehensive", detail, sample)
+
+@router.post("/jobs", response_model=schemas.ReportJob, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(job: schemas.ReportJobCreate, db: Session = Depends(get_db)):
+    """
+    Queue a PDF report for background generation
+    """
+    if job.report_type not in REPORT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown report type, use one of: {', '.join(REPORT_TYPES)}"
         )
-        
-    except Exception as e:
-        logger.error(f"Error generating items report: {str(e)}")
+    return report_job_queue.submit(db, job.report_type)
+
+@router.get("/jobs/{job_id}", response_model=schemas.ReportJob)
+def read_report_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get the status of a report job
+    """
+    db_job = db.get(models.ReportJob, job_id)
+    if db_job is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating report: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
         )
+    return db_job
 
-@router.get("/comprehensive", response_class=Response)
-async def generate_comprehensive_report(db: Session = Depends(get_db)):
+@router.get("/jobs/{job_id}/download", response_class=FileResponse)
+def download_report_job(job_id: str, db: Session = Depends(get_db)):
     """
-    Generate comprehensive PDF report with both users and items
+    Download the PDF of a completed report job
     """
-    try:
-        logger.info("Generating comprehensive PDF report")
-        
-        # Get all users and items from database
-        users = db.query(models.User).all()
-        items = db.query(models.Item).all()
-        
-        if not users and not items:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No data found in the database"
-            )
-        
-        # Generate PDF
-        pdf_content = pdf_service.generate_comprehensive_report(users, items)
-        
-        logger.info(f"Comprehensive PDF report generated successfully for {len(users)} users and {len(items)} items")
-        
-        return Response(
-            content=pdf_content,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": "attachment; filename=comprehensive_report.pdf"
-            }
+    db_job = db.get(models.ReportJob, job_id)
+    if db_job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
         )
-        
-    except Exception as e:
-        logger.error(f"Error generating comprehensive report: {str(e)}")
+    if db_job.status != COMPLETED or not db_job.file_path or not os.path.exists(db_job.file_path):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating report: {str(e)}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job is {db_job.status}, no PDF available"
         )
+    return FileResponse(
+        db_job.file_path,
+        media_type="application/pdf",
+        filename=f"{db_job.report_type}_report.pdf"
+    )
 
 @router.get("/health")
 async def reports_health_check():
@@ -132,4 +166,4 @@ async def reports_health_check():
         "status": "healthy",
         "service": "PDF Reports",
         "version": "1.0.0"
-    }
\ No newline at end of file
+    }
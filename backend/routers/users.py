@@ -1,45 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_db, get_read_db
+from pagination import paginate_rows_by_id
 import models, schemas
+from serialization import batch_response, insert_returning, rows_response, schema_columns
+from services import cache
+from services.batch import BatchRejected, apply_user_batch, run_batch
+from services.cache import response_cache
+from services.users import duplicate_user_message, insert_user
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+def read_users(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    # Rows are projected to the schema's columns and returned without re-validation
+    users, next_cursor = paginate_rows_by_id(
+        db, select(*schema_columns(models.User, schemas.User)), models.User.id, cursor, skip, limit
+    )
+    return rows_response(request, users, next_cursor)
 
 @router.post("/", response_model=schemas.User)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
+    # One INSERT; the unique indexes reject a taken email or username
+    # atomically, where checking first would race with concurrent signups.
+    # As in create_item, the new row changes report fingerprints by itself
+    try:
+        db_user = insert_returning(db, insert_user(user), models.User, schemas.User)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        message = duplicate_user_message(e)
+        if message is None:
+            raise
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            detail=message
         )
-    
-    db_user = db.query(models.User).filter(models.User.username == user.username).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
-    db_user = models.User(**user.model_dump())
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    response_cache.invalidate(cache.USERS)
     return db_user
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+def read_user(user_id: int, db: Session = Depends(get_read_db)):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return db_user
\ No newline at end of file
+    return db_user
+
+@router.post("/batch", response_model=schemas.BatchResult)
+def batch_users(
+    response: Response,
+    batch: schemas.UserBatch,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+    db: Session = Depends(get_db)
+):
+    """Create, update and delete users in one transaction, with per-row results"""
+    try:
+        body, replayed = run_batch(db, "users", batch, apply_user_batch, idempotency_key)
+    except BatchRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e)
+        )
+    return batch_response(body, replayed, response)
\ No newline at end of file
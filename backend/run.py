@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 """
 Startup script for the FastAPI backend
+
+    python run.py          production server: gunicorn with uvicorn workers
+    python run.py --dev    single process with auto-reload for development
 """
-import uvicorn
+import argparse
+import logging
 import os
+import sys
+import uvicorn
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-if __name__ == "__main__":
+def run_dev():
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -17,4 +23,33 @@ if __name__ == "__main__":
         reload=True,
         reload_dirs=["./"],
         log_level="info"
-    )
\ No newline at end of file
+    )
+
+def run_production():
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        sys.exit("Production mode needs gunicorn (pip install gunicorn, not available on Windows); use --dev otherwise")
+    # Schema setup runs once here, so the workers skip it on startup
+    logging.basicConfig(level=logging.INFO)
+    os.environ["DB_AUTO_INIT"] = "false"
+    from database import init_db
+    init_db()
+    # main:app and the gunicorn config are resolved from the backend directory
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.argv = [
+        "gunicorn",
+        "--chdir", backend_dir,
+        "--config", os.path.join(backend_dir, "gunicorn.conf.py"),
+        "main:app"
+    ]
+    run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the FastAPI backend")
+    parser.add_argument("--dev", action="store_true", help="run a single auto-reloading development server")
+    args = parser.parse_args()
+    if args.dev:
+        run_dev()
+    else:
+        run_production()
\ No newline at end of file
@@ -1,6 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+def _not_null(value):
+    # Optional only so the field can be left out of a partial update;
+    # an explicit null would hit a NOT NULL column
+    if value is None:
+        raise ValueError("may be omitted but not null")
+    return value
 
 class UserBase(BaseModel):
     username: str
@@ -9,6 +16,13 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     pass
 
+class UserUpdate(BaseModel):
+    username: Optional[str] = None
+    email: Optional[str] = None
+    is_active: Optional[bool] = None
+
+    _required = field_validator("username", "email", "is_active")(_not_null)
+
 class User(UserBase):
     id: int
     is_active: bool
@@ -56,6 +70,14 @@ class UserAccess(UserAccessBase):
     class Config:
         from_attributes = True
 
+class AccessLogAck(BaseModel):
+    status: str
+    queued: int
+    queue_depth: int
+
+class BulkAccessLogResult(BaseModel):
+    inserted: int
+
 class DashboardStats(BaseModel):
     total_users: int
     active_users: int
@@ -79,11 +101,60 @@ class ItemUpdate(BaseModel):
     description: Optional[str] = None
     completed: Optional[bool] = None
 
+    _required = field_validator("title", "completed")(_not_null)
+
 class Item(ItemBase):
     id: int
     completed: bool
     owner_id: int
     created_at: datetime
 
+    class Config:
+        from_attributes = True
+
+class ItemBatchUpdate(ItemUpdate):
+    id: int
+
+class ItemBatch(BaseModel):
+    create: List[ItemCreate] = []
+    update: List[ItemBatchUpdate] = []
+    delete: List[int] = []
+
+class UserBatchUpdate(UserUpdate):
+    id: int
+
+class UserBatch(BaseModel):
+    create: List[UserCreate] = []
+    update: List[UserBatchUpdate] = []
+    delete: List[int] = []
+    # Creates for an existing username update its email instead of failing
+    upsert: bool = False
+
+class BatchRowResult(BaseModel):
+    op: str
+    index: int
+    id: Optional[int] = None
+    status: str
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[BatchRowResult]
+
+class ReportJobCreate(BaseModel):
+    report_type: str
+
+class ReportJob(BaseModel):
+    id: str
+    report_type: str
+    status: str
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,70 @@
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from pagination import set_next_cursor
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List[Any]:
+    """The table columns of `model` behind each field of a response schema"""
+    table = model.__table__
+    return [table.c[name] for name in schema.model_fields]
+
+
+def insert_returning(db: Session, stmt, model, schema: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """
+    Execute a single-row INSERT and return the new row's schema fields.
+
+    Uses INSERT ... RETURNING where the dialect has it (SQLite, PostgreSQL,
+    MariaDB); on MySQL and SQLite before 3.35 the row is read back by its
+    new primary key. None when an ON CONFLICT DO NOTHING insert skipped the
+    row.
+    """
+    columns = schema_columns(model, schema)
+    if db.get_bind().dialect.insert_returning:
+        return db.execute(stmt.returning(*columns)).mappings().first()
+    result = db.execute(stmt)
+    if not result.rowcount:
+        return None
+    new_id = result.inserted_primary_key[0]
+    return db.execute(select(*columns).where(model.id == new_id)).mappings().one()
+
+
+def rows_response(
+    request: Request,
+    rows: List[Dict[str, Any]],
+    next_cursor: Optional[str] = None
+) -> ORJSONResponse:
+    """
+    Serialize rows projected straight from SQL without response_model validation.
+
+    The rows come from the database with exactly the schema's fields (see
+    schema_columns), so validating them again per row only costs time;
+    orjson encodes the dicts, datetimes included, directly.
+    """
+    response = ORJSONResponse(rows)
+    set_next_cursor(request, response, next_cursor)
+    return response
+
+def batch_response(body: bytes, replayed: bool = False, response: Optional[Response] = None) -> Response:
+    """
+    Send an already encoded batch response body.
+
+    Replays of a stored response (same Idempotency-Key) are marked with an
+    Idempotent-Replayed header so clients can tell them apart. Headers that
+    dependencies set on the route's injected `response` (e.g. the
+    read-your-writes cookie from get_db) are carried over, since FastAPI
+    only merges them into responses it builds itself.
+    """
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    result = Response(body, media_type="application/json", headers=headers)
+    if response is not None:
+        result.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers
+            if name not in (b"content-length", b"content-type")
+        )
+    return result
\ No newline at end of file
@@ -0,0 +1,198 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+import models, schemas
+from services.access_rollups import record_access_rollups
+from services.cache import response_cache, ACCESS_LOG
+
+logger = logging.getLogger(__name__)
+
+# Errors that say nothing about the rows (locked database, dropped
+# connection), so the same batch is retried after a pause
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+# Seconds before the first retry, doubled for each further one
+RETRY_BACKOFF = 0.1
+
+
+def write_access_logs(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Insert access log rows with a single executemany INSERT (caller commits)"""
+    if not rows:
+        return 0
+    db.execute(insert(models.UserAccess), rows)
+    record_access_rollups(db, rows)
+    return len(rows)
+
+
+class AccessLogBuffer:
+    """
+    In-process ingestion queue for access log events.
+
+    Events are acknowledged as soon as they are queued and written to the
+    user_access table in bulk, either when BATCH_SIZE events are waiting or
+    when FLUSH_INTERVAL seconds have passed since the last flush.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_size: int, retries: int = 0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.enqueued_total = 0
+        self.flushed_total = 0
+        self.dropped_total = 0
+        self.failed_total = 0
+        self.retried_total = 0
+        self.last_flush_at = None
+
+    def start(self):
+        """Start the background flusher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="access-log-flusher", daemon=True
+        )
+        self._thread.start()
+        logger.info("Access log buffer started")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the flusher thread and write everything still queued"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        logger.info(f"Access log buffer stopped ({self.flushed_total} events flushed)")
+
+    def enqueue(self, access_data: schemas.UserAccessCreate) -> bool:
+        """Queue an access event, returning False if the buffer is full"""
+        row = access_data.model_dump()
+        row["access_time"] = datetime.utcnow()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped_total += 1
+            return False
+        with self._lock:
+            self.enqueued_total += 1
+        return True
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self) -> int:
+        """Write all queued events to the database, one transaction per batch"""
+        written = 0
+        while True:
+            rows = self._drain(self.batch_size)
+            if not rows:
+                break
+            written += self._write(rows)
+        return written
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        """Write rows in one transaction; returns the error instead of raising"""
+        db = SessionLocal()
+        try:
+            write_access_logs(db, rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            return e
+        finally:
+            db.close()
+        return None
+
+    def _insert_with_retries(self, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        """_insert(), retried with exponential backoff while the error is transient"""
+        error = self._insert(rows)
+        for attempt in range(self.retries):
+            if not isinstance(error, TRANSIENT_ERRORS):
+                break
+            delay = RETRY_BACKOFF * 2 ** attempt
+            logger.warning(f"Writing {len(rows)} access log events failed, retrying in {delay:.1f}s: {error}")
+            with self._lock:
+                self.retried_total += 1
+            time.sleep(delay)
+            error = self._insert(rows)
+        return error
+
+    def _write(self, rows: List[Dict[str, Any]]) -> int:
+        error = self._insert_with_retries(rows)
+        if error is None:
+            response_cache.invalidate(ACCESS_LOG)
+            with self._lock:
+                self.flushed_total += len(rows)
+                self.last_flush_at = datetime.utcnow()
+            return len(rows)
+        if isinstance(error, (IntegrityError, DataError)) and len(rows) > 1:
+            # A bad row (e.g. an unknown user_id) fails the whole INSERT;
+            # retry the halves so only the offending rows are dropped
+            middle = len(rows) // 2
+            return self._write(rows[:middle]) + self._write(rows[middle:])
+        with self._lock:
+            self.failed_total += len(rows)
+        if len(rows) == 1:
+            logger.error(f"Dropped access log event {rows[0]}: {error}")
+        else:
+            logger.error(f"Failed to flush {len(rows)} access log events: {error}")
+        return 0
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.is_set():
+            elapsed = time.monotonic() - last_flush
+            if self.depth >= self.batch_size or elapsed >= self.flush_interval:
+                self.flush()
+                last_flush = time.monotonic()
+                continue
+            # Wake up early if a full batch is waiting
+            self._stop.wait(min(0.05, self.flush_interval - elapsed))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters"""
+        with self._lock:
+            return {
+                "queue_depth": self.depth,
+                "max_queue_size": self._queue.maxsize,
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval,
+                "enqueued_total": self.enqueued_total,
+                "flushed_total": self.flushed_total,
+                "dropped_total": self.dropped_total,
+                "failed_total": self.failed_total,
+                "retried_total": self.retried_total,
+                "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            }
+
+# Global instance
+access_log_buffer = AccessLogBuffer(
+    batch_size=settings.ACCESS_LOG_BATCH_SIZE,
+    flush_interval=settings.ACCESS_LOG_FLUSH_INTERVAL,
+    max_size=settings.ACCESS_LOG_MAX_QUEUE_SIZE,
+    retries=settings.ACCESS_LOG_WRITE_RETRIES,
+)
@@ -0,0 +1,301 @@
+"""
+Monthly partitions for the access log.
+
+New events are always written to the hot `user_access` table. Rotation
+moves every row from a closed month into its own `user_access_YYYYMM`
+partition table, so the hot table only holds the current month and the
+recent-access and stats queries stay on a small working set. Retention
+archives partitions older than ACCESS_LOG_RETENTION_MONTHS to gzipped
+NDJSON files and drops them with a single DROP TABLE.
+
+Reads go through `access_log_tables`, which returns the hot table
+followed by the partitions newest first. Because rotation only moves
+whole closed months, every row in a table is newer than every row in the
+tables after it, so newest-first listings can stop at the first table
+that fills the page.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table,
+    and_, delete, func, insert, inspect, or_, select, type_coerce
+)
+from sqlalchemy.orm import Session
+
+import models
+from pagination import decode_time_cursor, encode_time_cursor, page_rows
+
+logger = logging.getLogger(__name__)
+
+HOT_TABLE = models.UserAccess.__table__
+PARTITION_PREFIX = HOT_TABLE.name + "_"
+PARTITION_PATTERN = re.compile(r"^" + re.escape(PARTITION_PREFIX) + r"(\d{6})$")
+
+# Partition tables are not part of Base.metadata, so create_all ignores them
+partition_metadata = MetaData()
+
+# Partition names are cached briefly; rotation runs from the CLI, so other
+# processes may see a new or dropped partition up to this many seconds late
+PARTITION_CACHE_SECONDS = 30.0
+_partition_cache: Dict[str, Any] = {"names": None, "loaded_at": 0.0}
+_partition_lock = threading.Lock()
+
+ARCHIVE_BATCH_SIZE = 10000
+
+# Extra column carrying access_time as stored, for the next page's cursor
+CURSOR_TIME = "_cursor_time"
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def previous_month(value: datetime) -> datetime:
+    if value.month == 1:
+        return value.replace(year=value.year - 1, month=12)
+    return value.replace(month=value.month - 1)
+
+
+def period_of(value: datetime) -> str:
+    return value.strftime("%Y%m")
+
+
+def period_start(period: str) -> datetime:
+    return datetime.strptime(period, "%Y%m")
+
+
+def partition_table(period: str) -> Table:
+    """Table object for the partition holding `period` (YYYYMM)"""
+    name = PARTITION_PREFIX + period
+    table = partition_metadata.tables.get(name)
+    if table is not None:
+        return table
+    return Table(
+        name,
+        partition_metadata,
+        Column("id", Integer, primary_key=True),
+        Column("user_id", Integer, nullable=False),
+        Column("access_time", DateTime),
+        Column("ip_address", String(45)),
+        Column("user_agent", String(500)),
+        Column("endpoint", String(200)),
+        Column("method", String(10)),
+        Column("status_code", Integer),
+        Index(f"ix_{name}_access_time_id", "access_time", "id"),
+        Index(f"ix_{name}_user_id_access_time_id", "user_id", "access_time", "id"),
+    )
+
+
+def list_partitions(db: Session, refresh: bool = False) -> List[str]:
+    """Existing partition periods, newest first"""
+    with _partition_lock:
+        cached = _partition_cache["names"]
+        if not refresh and cached is not None and time.monotonic() - _partition_cache["loaded_at"] < PARTITION_CACHE_SECONDS:
+            return cached
+    periods = sorted(
+        (m.group(1) for m in map(PARTITION_PATTERN.match, inspect(db.connection()).get_table_names()) if m),
+        reverse=True,
+    )
+    with _partition_lock:
+        _partition_cache["names"] = periods
+        _partition_cache["loaded_at"] = time.monotonic()
+    return periods
+
+
+def access_log_tables(db: Session, since: Optional[datetime] = None) -> List[Table]:
+    """Hot table plus partitions overlapping [since, now), newest first"""
+    tables = [HOT_TABLE]
+    for period in list_partitions(db):
+        if since is not None and next_month(period_start(period)) <= since:
+            break
+        tables.append(partition_table(period))
+    return tables
+
+
+def paginate_access_logs(
+    db: Session,
+    build_select: Callable[[Table], Any],
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Page through access log rows newest first on (access_time, id).
+
+    `build_select(table)` returns the SELECT (columns, joins, filters) for
+    one access log table; ordering, the keyset filter and limits are added
+    here. Tables are read newest first until the page is full. Returns the
+    rows as dicts.
+
+    The cursor keeps access_time as the database returns it without type
+    processing. SQLite stores timestamps as text, and rows written by the
+    server default lack the fractional seconds a bound datetime renders
+    with, so comparing against a re-rendered datetime would match the
+    cursor row itself again.
+    """
+    after = decode_time_cursor(cursor) if cursor else None
+    wanted = limit + 1
+    rows: List[Any] = []
+    for table in access_log_tables(db):
+        stored_time = type_coerce(table.c.access_time, String)
+        stmt = build_select(table).add_columns(stored_time.label(CURSOR_TIME))
+        if after:
+            last_time, last_id = after
+            time_column = stored_time if isinstance(last_time, str) else table.c.access_time
+            stmt = stmt.where(or_(
+                time_column < last_time,
+                and_(time_column == last_time, table.c.id < last_id)
+            ))
+        elif skip:
+            # Legacy offset paging: skip whole tables by counting them
+            matching = db.scalar(select(func.count()).select_from(stmt.subquery()))
+            if matching <= skip:
+                skip -= matching
+                continue
+            stmt = stmt.offset(skip)
+            skip = 0
+        stmt = stmt.order_by(
+            table.c.access_time.desc(), table.c.id.desc()
+        ).limit(wanted - len(rows))
+        rows.extend(db.execute(stmt).all())
+        if len(rows) >= wanted:
+            break
+
+    rows, has_more = page_rows(rows, limit)
+    next_cursor = encode_time_cursor(getattr(rows[-1], CURSOR_TIME), rows[-1].id) if has_more and rows else None
+    return [
+        {key: value for key, value in row._mapping.items() if key != CURSOR_TIME} for row in rows
+    ], next_cursor
+
+
+def find_access_log(db: Session, access_id: int) -> Tuple[Optional[Table], Optional[Any]]:
+    """Locate an access log row by id in the hot table or a partition"""
+    for table in access_log_tables(db):
+        row = db.execute(select(table).where(table.c.id == access_id)).first()
+        if row is not None:
+            return table, row
+    return None, None
+
+
+def rotate_access_logs(db: Session, now: Optional[datetime] = None) -> List[str]:
+    """Move closed months out of the hot table into their partitions (caller commits)"""
+    current = month_start(now or datetime.utcnow())
+    oldest = db.scalar(select(func.min(HOT_TABLE.c.access_time)))
+    rotated = []
+    if oldest is None:
+        return rotated
+
+    start = month_start(oldest)
+    while start < current:
+        end = next_month(start)
+        in_month = and_(HOT_TABLE.c.access_time >= start, HOT_TABLE.c.access_time < end)
+        last_id = db.scalar(select(func.max(HOT_TABLE.c.id)).where(in_month))
+        if last_id is not None:
+            # Copy and delete the same id range: a row committed between the
+            # two statements stays in the hot table for the next rotation
+            # instead of being deleted without a copy
+            moved = and_(in_month, HOT_TABLE.c.id <= last_id)
+            period = period_of(start)
+            table = partition_table(period)
+            table.create(bind=db.connection(), checkfirst=True)
+            db.execute(insert(table).from_select(
+                [c.name for c in table.columns],
+                select(*[HOT_TABLE.c[c.name] for c in table.columns]).where(moved)
+            ))
+            db.execute(delete(HOT_TABLE).where(moved))
+            rotated.append(period)
+            logger.info(f"Rotated access logs for {period} into {table.name}")
+        start = end
+
+    list_partitions(db, refresh=True)
+    return rotated
+
+
+def archive_partition(db: Session, period: str, archive_dir: str) -> str:
+    """Write a partition to a gzipped NDJSON file and return its path"""
+    table = partition_table(period)
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{table.name}.ndjson.gz")
+    tmp_path = path + ".tmp"
+    result = db.execute(
+        select(table).order_by(table.c.access_time, table.c.id)
+        .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+    )
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as archive:
+        for row in result.mappings():
+            archive.write(json.dumps(dict(row), default=str) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _forget_rollups(db: Session, period: str):
+    """Remove a period's events from the rollups using its hourly buckets"""
+    start = period_start(period)
+    in_period = and_(
+        models.AccessHourlyRollup.bucket >= start,
+        models.AccessHourlyRollup.bucket < next_month(start),
+    )
+    totals = db.execute(
+        select(
+            models.AccessHourlyRollup.dimension,
+            models.AccessHourlyRollup.key,
+            func.sum(models.AccessHourlyRollup.count),
+        ).where(in_period).group_by(
+            models.AccessHourlyRollup.dimension, models.AccessHourlyRollup.key
+        )
+    ).all()
+    for dimension, key, count in totals:
+        db.query(models.AccessCounter).filter(
+            models.AccessCounter.dimension == dimension,
+            models.AccessCounter.key == key,
+        ).update({models.AccessCounter.count: models.AccessCounter.count - count})
+    db.execute(delete(models.AccessHourlyRollup).where(in_period))
+
+
+def drop_partition(db: Session, period: str):
+    """Drop a whole partition and its share of the rollups (caller commits)"""
+    _forget_rollups(db, period)
+    partition_table(period).drop(bind=db.connection(), checkfirst=True)
+    logger.info(f"Dropped access log partition {period}")
+
+
+def apply_retention(
+    db: Session,
+    retention_months: int,
+    archive_dir: Optional[str],
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Archive (optionally) and drop partitions older than the retention window.
+
+    Keeps the current month plus `retention_months` closed months. Each
+    partition is committed separately so an interrupted run loses nothing.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = month_start(now or datetime.utcnow())
+    for _ in range(retention_months):
+        cutoff = previous_month(cutoff)
+    expired = [p for p in list_partitions(db, refresh=True) if period_start(p) < cutoff]
+    for period in expired:
+        if archive_dir:
+            path = archive_partition(db, period, archive_dir)
+            logger.info(f"Archived access log partition {period} to {path}")
+        drop_partition(db, period)
+        db.commit()
+    list_partitions(db, refresh=True)
+    return expired
@@ -0,0 +1,143 @@
+"""
+Incrementally maintained access log aggregates.
+
+Every write to user_access also bumps the matching rows in access_counters
+(all-time counts per endpoint/method/status) and access_hourly_rollups
+(the same counts per hour), so the dashboard reads a handful of
+precomputed rows instead of scanning the access log.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger(__name__)
+
+# Dimension name -> access log column it counts
+DIMENSIONS = {
+    "endpoint": "endpoint",
+    "method": "method",
+    "status": "status_code",
+}
+TOTAL = "total"
+
+REBUILD_BATCH_SIZE = 10000
+
+
+def hour_bucket(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _count_rows(rows: Iterable[Dict[str, Any]]) -> Tuple[Counter, Counter]:
+    totals: Counter = Counter()
+    hourly: Counter = Counter()
+    for row in rows:
+        bucket = hour_bucket(row.get("access_time") or datetime.utcnow())
+        keys = [(TOTAL, "")]
+        for dimension, column in DIMENSIONS.items():
+            value = row.get(column)
+            if value is not None:
+                keys.append((dimension, str(value)))
+        for dimension, key in keys:
+            totals[(dimension, key)] += 1
+            hourly[(bucket, dimension, key)] += 1
+    return totals, hourly
+
+
+def _upsert_counts(db: Session, model, key_columns: List[str], counts: Counter):
+    """Add counts to existing rows, creating rows that don't exist yet"""
+    if not counts:
+        return
+    rows = [
+        dict(zip(key_columns, key), count=count)
+        for key, count in counts.items()
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={"count": model.count + stmt.excluded.count},
+        )
+        db.execute(stmt, rows)
+        return
+
+    # Generic fallback: update in place, insert whatever didn't match
+    for row in rows:
+        conditions = [getattr(model, column) == row[column] for column in key_columns]
+        result = db.execute(
+            update(model).where(*conditions).values(count=model.count + row["count"])
+        )
+        if result.rowcount == 0:
+            db.add(model(**row))
+    db.flush()
+
+
+def record_access_rollups(db: Session, rows: List[Dict[str, Any]], sign: int = 1):
+    """Apply access log rows to the rollup tables (sign=-1 removes them)"""
+    totals, hourly = _count_rows(rows)
+    if sign != 1:
+        totals = Counter({key: count * sign for key, count in totals.items()})
+        hourly = Counter({key: count * sign for key, count in hourly.items()})
+    _upsert_counts(db, models.AccessCounter, ["dimension", "key"], totals)
+    _upsert_counts(db, models.AccessHourlyRollup, ["bucket", "dimension", "key"], hourly)
+
+
+def read_breakdowns(db: Session) -> Dict[str, Dict[str, int]]:
+    """All-time counts per endpoint, method and status code"""
+    breakdowns: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+    counters = db.execute(
+        select(models.AccessCounter.dimension, models.AccessCounter.key, models.AccessCounter.count)
+        .where(models.AccessCounter.dimension != TOTAL, models.AccessCounter.count > 0)
+    )
+    for dimension, key, count in counters:
+        breakdowns[dimension][key] = count
+    return breakdowns
+
+
+def recent_count_query(since: datetime):
+    """
+    SELECT for the number of access events since `since`, at hour granularity.
+
+    The hour containing `since` is counted in full, so the result can
+    include up to one extra hour of events.
+    """
+    return (
+        select(func.coalesce(func.sum(models.AccessHourlyRollup.count), 0))
+        .where(
+            models.AccessHourlyRollup.dimension == TOTAL,
+            models.AccessHourlyRollup.bucket >= hour_bucket(since),
+        )
+    )
+
+
+def read_recent_count(db: Session, since: datetime) -> int:
+    """Number of access events since `since`, see recent_count_query"""
+    return db.scalar(recent_count_query(since))
+
+
+def rebuild_access_rollups(db: Session) -> int:
+    """Recompute all rollup rows from the access log and its partitions (caller commits)"""
+    from services.access_partitions import access_log_tables
+
+    db.execute(delete(models.AccessCounter))
+    db.execute(delete(models.AccessHourlyRollup))
+
+    processed = 0
+    for table in access_log_tables(db):
+        columns = [table.c.access_time] + [table.c[column] for column in DIMENSIONS.values()]
+        result = db.execute(
+            select(*columns).execution_options(yield_per=REBUILD_BATCH_SIZE)
+        ).mappings()
+        for batch in result.partitions():
+            record_access_rollups(db, [dict(row) for row in batch])
+            processed += len(batch)
+    logger.info(f"Rebuilt access rollups from {processed} access log rows")
+    return processed
@@ -0,0 +1,363 @@
+"""
+Batch create/update/delete for items and users.
+
+A batch is applied with a few set-based statements in one transaction:
+one multi-row INSERT ... RETURNING for the creates, executemany UPDATEs
+by primary key and chunked DELETE ... WHERE id IN (...). Rows that can't
+be applied (unknown ids, taken usernames or emails) are reported in the
+per-row results and skipped; everything else is committed together.
+User batches with `upsert` set create with INSERT ... ON CONFLICT
+(username) DO UPDATE, so re-importing existing users updates them.
+
+With an idempotency key the response body is stored in the same
+transaction, so a retried batch gets the original response back instead
+of being applied twice.
+"""
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+import models
+import schemas
+from services import cache
+from services.cache import response_cache
+from services.report_cache import bump_data_version
+from services.users import DUPLICATE_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+NOT_FOUND = "not_found"
+CONFLICT = "conflict"
+
+# Values per IN (...) clause when looking up or deleting batch rows
+LOOKUP_CHUNK_SIZE = 500
+
+# Owner id of usernames and emails taken by rows earlier in the same batch
+_CLAIMED = -1
+
+CACHE_TAGS = {
+    models.User: cache.USERS,
+    models.Item: cache.ITEMS,
+}
+
+
+class BatchRejected(ValueError):
+    """Raised when a batch is refused as a whole"""
+    status_code = 400
+
+
+class BatchTooLarge(BatchRejected):
+    status_code = 413
+
+
+class IdempotencyKeyReused(BatchRejected):
+    status_code = 422
+
+
+class BatchConflict(BatchRejected):
+    """A constraint failed after the lookups, e.g. a concurrent signup took a username"""
+    status_code = 409
+
+
+def _chunks(values: List[Any], size: int = LOOKUP_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _lookup(db: Session, columns, column, values: Iterable[Any]) -> List[Any]:
+    """Rows of `columns` where `column` is one of `values`, one query per chunk"""
+    rows = []
+    for chunk in _chunks(list(set(values))):
+        rows.extend(db.execute(select(*columns).where(column.in_(chunk))))
+    return rows
+
+
+def _insert_rows(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert rows in one executemany and return their ids in input order"""
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+    # No RETURNING (MySQL): one INSERT per row to learn each new id
+    return [db.execute(insert(model).values(**row)).inserted_primary_key[0] for row in rows]
+
+
+def _upsert_users(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert users, updating the email of those whose username exists, and
+    return their ids in input order.
+    """
+    if not rows:
+        return []
+    dialect = db.get_bind().dialect
+    if dialect.name in ("sqlite", "postgresql") and dialect.insert_executemany_returning_sort_by_parameter_order:
+        upsert = sqlite.insert if dialect.name == "sqlite" else postgresql.insert
+        stmt = upsert(models.User)
+        stmt = stmt.on_conflict_do_update(index_elements=["username"], set_={"email": stmt.excluded.email})
+        return list(db.scalars(stmt.returning(models.User.id, sort_by_parameter_order=True), rows))
+
+    # Generic fallback: update in place, insert whatever didn't match
+    ids = []
+    for row in rows:
+        by_username = models.User.username == row["username"]
+        if db.execute(update(models.User).where(by_username).values(email=row["email"])).rowcount:
+            ids.append(db.scalar(select(models.User.id).where(by_username)))
+        else:
+            ids.extend(_insert_rows(db, models.User, [row]))
+    return ids
+
+
+def _update_rows(db: Session, model, rows: List[Dict[str, Any]]):
+    """UPDATE ... WHERE id = ? executemany, grouped by the columns each row sets"""
+    rows = [row for row in rows if len(row) > 1]
+    if rows:
+        db.execute(update(model), rows)
+
+
+def _delete_ids(db: Session, model, ids: List[int]):
+    for chunk in _chunks(list(set(ids))):
+        db.execute(
+            delete(model).where(model.id.in_(chunk)).execution_options(synchronize_session=False)
+        )
+
+
+def _result(op: str, index: int, status: str, id: Optional[int] = None, error: Optional[str] = None) -> Dict[str, Any]:
+    return {"op": op, "index": index, "id": id, "status": status, "error": error}
+
+
+def _summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    counts = Counter(result["status"] for result in results)
+    return {
+        "created": counts[CREATED],
+        "updated": counts[UPDATED],
+        "deleted": counts[DELETED],
+        "failed": counts[NOT_FOUND] + counts[CONFLICT],
+        "results": results,
+    }
+
+
+def apply_item_batch(db: Session, batch: schemas.ItemBatch, owner_id: int) -> Tuple[Dict[str, Any], Set]:
+    """Apply an item batch (caller commits); returns the response and the models changed"""
+    results = []
+    changed = set()
+
+    if batch.create:
+        ids = _insert_rows(
+            db, models.Item, [dict(item.model_dump(), owner_id=owner_id) for item in batch.create]
+        )
+        results.extend(_result("create", index, CREATED, id) for index, id in enumerate(ids))
+
+    existing = {
+        row.id for row in
+        _lookup(db, [models.Item.id], models.Item.id, [row.id for row in batch.update] + batch.delete)
+    }
+
+    updates = []
+    for index, row in enumerate(batch.update):
+        if row.id not in existing:
+            results.append(_result("update", index, NOT_FOUND, row.id, "Item not found"))
+            continue
+        updates.append(row.model_dump(exclude_unset=True))
+        results.append(_result("update", index, UPDATED, row.id))
+    _update_rows(db, models.Item, updates)
+
+    deletes = []
+    for index, item_id in enumerate(batch.delete):
+        if item_id not in existing:
+            results.append(_result("delete", index, NOT_FOUND, item_id, "Item not found"))
+            continue
+        deletes.append(item_id)
+        results.append(_result("delete", index, DELETED, item_id))
+    _delete_ids(db, models.Item, deletes)
+
+    if batch.create or updates or deletes:
+        changed.add(models.Item)
+    return _summary(results), changed
+
+
+def apply_user_batch(db: Session, batch: schemas.UserBatch) -> Tuple[Dict[str, Any], Set]:
+    """Apply a user batch (caller commits); returns the response and the models changed"""
+    results = []
+    changed = set()
+
+    # Owners of the usernames and emails the batch sets, from the
+    # database first and then from the rows accepted so far
+    emails = {
+        row.email: row.id for row in _lookup(
+            db, [models.User.id, models.User.email], models.User.email,
+            [row.email for row in batch.create + batch.update if row.email is not None]
+        )
+    }
+    usernames = {
+        row.username: row.id for row in _lookup(
+            db, [models.User.id, models.User.username], models.User.username,
+            [row.username for row in batch.create + batch.update if row.username is not None]
+        )
+    }
+
+    def conflict(row, user_id=None) -> Optional[str]:
+        if row.email is not None and emails.get(row.email, user_id) != user_id:
+            return DUPLICATE_MESSAGES["email"]
+        if row.username is not None and usernames.get(row.username, user_id) != user_id:
+            return DUPLICATE_MESSAGES["username"]
+        return None
+
+    creates = []
+    for index, row in enumerate(batch.create):
+        # In upsert mode a create for an existing username updates that user
+        user_id = usernames.get(row.username) if batch.upsert else None
+        error = DUPLICATE_MESSAGES["username"] if user_id == _CLAIMED else conflict(row, user_id)
+        if error:
+            results.append(_result("create", index, CONFLICT, error=error))
+            continue
+        # New ids are filled in once inserted
+        emails[row.email] = usernames[row.username] = _CLAIMED
+        result = _result("create", index, UPDATED if user_id else CREATED, user_id)
+        results.append(result)
+        creates.append((result, row.model_dump()))
+    rows = [values for _, values in creates]
+    ids = _upsert_users(db, rows) if batch.upsert else _insert_rows(db, models.User, rows)
+    for (result, _), user_id in zip(creates, ids):
+        result["id"] = user_id
+
+    existing = {
+        row.id for row in
+        _lookup(db, [models.User.id], models.User.id, [row.id for row in batch.update] + batch.delete)
+    }
+
+    updates = []
+    for index, row in enumerate(batch.update):
+        if row.id not in existing:
+            results.append(_result("update", index, NOT_FOUND, row.id, "User not found"))
+            continue
+        error = conflict(row, row.id)
+        if error:
+            results.append(_result("update", index, CONFLICT, row.id, error))
+            continue
+        if row.email is not None:
+            emails[row.email] = row.id
+        if row.username is not None:
+            usernames[row.username] = row.id
+        updates.append(row.model_dump(exclude_unset=True))
+        results.append(_result("update", index, UPDATED, row.id))
+    _update_rows(db, models.User, updates)
+
+    # Users still referenced by items or (hot) access log rows are kept, and
+    # so is the default owner, whose id item creation has cached
+    candidates = [user_id for user_id in batch.delete if user_id in existing]
+    default_owner = db.scalar(
+        select(models.User.id).where(models.User.username == settings.DEFAULT_OWNER_USERNAME)
+    ) if candidates else None
+    owners = {row.owner_id for row in _lookup(db, [models.Item.owner_id], models.Item.owner_id, candidates)}
+    logged = {row.user_id for row in _lookup(db, [models.UserAccess.user_id], models.UserAccess.user_id, candidates)}
+
+    deletes = []
+    for index, user_id in enumerate(batch.delete):
+        if user_id not in existing:
+            results.append(_result("delete", index, NOT_FOUND, user_id, "User not found"))
+        elif user_id == default_owner:
+            results.append(_result("delete", index, CONFLICT, user_id, "User is the default owner"))
+        elif user_id in owners:
+            results.append(_result("delete", index, CONFLICT, user_id, "User still owns items"))
+        elif user_id in logged:
+            results.append(_result("delete", index, CONFLICT, user_id, "User has access log entries"))
+        else:
+            deletes.append(user_id)
+            results.append(_result("delete", index, DELETED, user_id))
+    _delete_ids(db, models.User, deletes)
+
+    if creates or updates or deletes:
+        changed.add(models.User)
+    return _summary(results), changed
+
+
+def _request_hash(batch: BaseModel) -> str:
+    return hashlib.sha256(
+        orjson.dumps(batch.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    ).hexdigest()
+
+
+def _key_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def _stored_response(db: Session, scope: str, key: str, request_hash: str) -> Optional[bytes]:
+    stored = db.execute(
+        select(models.IdempotencyKey.request_hash, models.IdempotencyKey.response).where(
+            models.IdempotencyKey.scope == scope,
+            models.IdempotencyKey.key == key,
+            models.IdempotencyKey.created_at >= _key_cutoff(),
+        )
+    ).first()
+    if stored is None:
+        return None
+    if stored.request_hash != request_hash:
+        raise IdempotencyKeyReused("Idempotency key was already used for a different batch")
+    return stored.response.encode()
+
+
+def run_batch(
+    db: Session,
+    scope: str,
+    batch: BaseModel,
+    apply: Callable[..., Tuple[Dict[str, Any], Set]],
+    idempotency_key: Optional[str] = None,
+    **options
+) -> Tuple[bytes, bool]:
+    """
+    Apply a batch in one transaction and return the JSON response body,
+    plus whether it was replayed from an earlier request with the same key.
+    `options` are passed on to `apply`.
+    """
+    size = sum(len(rows) for rows in (batch.create, batch.update, batch.delete))
+    if size > settings.BATCH_MAX_ROWS:
+        raise BatchTooLarge(f"Batch exceeds {settings.BATCH_MAX_ROWS} rows")
+
+    request_hash = _request_hash(batch) if idempotency_key else None
+    if idempotency_key:
+        stored = _stored_response(db, scope, idempotency_key, request_hash)
+        if stored is not None:
+            return stored, True
+
+    try:
+        response, changed = apply(db, batch, **options)
+        body = orjson.dumps(response)
+        if idempotency_key:
+            db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.created_at < _key_cutoff()))
+            db.add(models.IdempotencyKey(
+                scope=scope, key=idempotency_key, request_hash=request_hash, response=body.decode()
+            ))
+        if changed:
+            bump_data_version(db, *changed)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        # A concurrent request with the same key committed first: its
+        # response stands and this attempt is rolled back
+        stored = _stored_response(db, scope, idempotency_key, request_hash) if idempotency_key else None
+        if stored is None:
+            logger.warning(f"Batch {scope} rolled back by a constraint: {e.orig}")
+            raise BatchConflict("Batch conflicts with the current data, nothing was applied")
+        logger.info(f"Batch {scope}/{idempotency_key} was applied by a concurrent request")
+        return stored, True
+
+    for model in changed:
+        response_cache.invalidate(CACHE_TAGS[model])
+    logger.info(
+        f"Applied {scope} batch: {response['created']} created, {response['updated']} updated, "
+        f"{response['deleted']} deleted, {response['failed']} failed"
+    )
+    return body, False
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache tags fired by the write paths
+USERS = "users"
+ITEMS = "items"
+CONTACTS = "contacts"
+ACCESS_LOG = "access_log"
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "tags")
+
+    def __init__(self, value: Any, tags: frozenset):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.tags = tags
+
+
+class ResponseCache:
+    """
+    In-process TTL cache for read-mostly aggregate responses.
+
+    Entries younger than `ttl` are served directly. Entries between `ttl`
+    and `ttl + stale_ttl` are served stale while a background thread
+    recomputes them. Write paths call `invalidate()` with the tags they
+    touch, which drops every entry carrying one of those tags.
+
+    The cache is per process: with several workers, an invalidation only
+    reaches the worker that handled the write. The other workers keep
+    serving their entry until it is older than `ttl + stale_ttl` (plus one
+    recomputation), so that is how stale a response can be after a write.
+    The report cache's DataVersion counters can't key these entries
+    instead: the aggregates also count writes that don't bump them
+    (contact updates, access log events).
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[str, _Entry] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so in-flight computations that
+        # started before a write don't store their (outdated) result
+        self._epoch = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.refresh_errors = 0
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        tags: Iterable[str] = (),
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for `key`, computing it when missing or expired"""
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        tags = frozenset(tags)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            epoch = self._epoch
+            if entry is not None:
+                age = time.monotonic() - entry.stored_at
+                if age < ttl:
+                    self.hits += 1
+                    return entry.value
+                if age < ttl + stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, compute, tags, epoch),
+                            name=f"cache-refresh-{key}",
+                            daemon=True,
+                        ).start()
+                    return entry.value
+            self.misses += 1
+
+        value = compute()
+        self._store(key, value, tags, epoch)
+        return value
+
+    def _store(self, key: str, value: Any, tags: frozenset, epoch: int):
+        with self._lock:
+            if epoch == self._epoch:
+                self._entries[key] = _Entry(value, tags)
+
+    def _refresh(self, key: str, compute: Callable[[], Any], tags: frozenset, epoch: int):
+        try:
+            self._store(key, compute(), tags, epoch)
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            logger.error(f"Background refresh of cache entry {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, *tags: str):
+        """Drop every entry tagged with any of `tags` (all entries if none given)"""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            if not tags:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if e.tags.intersection(tags)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for tuning the TTLs"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+                "refresh_errors": self.refresh_errors,
+            }
+
+# Global instance
+response_cache = ResponseCache(
+    ttl=settings.CACHE_TTL,
+    stale_ttl=settings.CACHE_STALE_TTL,
+)
@@ -0,0 +1,137 @@
+"""
+Index check for the query patterns the routers issue.
+
+QUERY_PATTERNS lists the filter/sort column sequences used by the
+routers and services. `check_indexes` verifies that each one is served by
+a declared index (a left prefix match on an index, unique constraint or
+primary key), and compares the declared indexes with what actually exists
+in the database, since `create_all` never adds indexes to tables that
+already exist.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Index, MetaData, Table, UniqueConstraint, inspect
+from sqlalchemy.engine import Engine
+
+from database import Base
+import models
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryPattern:
+    name: str
+    table: str
+    # Equality columns first, then the range/ORDER BY columns
+    columns: Tuple[str, ...]
+
+
+QUERY_PATTERNS: List[QueryPattern] = [
+    QueryPattern("users: lookup by id", "users", ("id",)),
+    QueryPattern("users: uniqueness check by email", "users", ("email",)),
+    QueryPattern("users: uniqueness check by username", "users", ("username",)),
+    QueryPattern("items: lookup and keyset by id", "items", ("id",)),
+    QueryPattern("contacts: lookup and keyset by id", "contacts", ("id",)),
+    QueryPattern("dashboard: recent access ORDER BY access_time, id", "user_access", ("access_time", "id")),
+    QueryPattern("dashboard: user history WHERE user_id ORDER BY access_time, id", "user_access", ("user_id", "access_time", "id")),
+    QueryPattern("rollups: counter upsert", "access_counters", ("dimension", "key")),
+    QueryPattern("rollups: hourly upsert and seven-day window", "access_hourly_rollups", ("bucket", "dimension", "key")),
+]
+
+# Indexes earlier versions created that are no longer declared and can be dropped
+RETIRED_INDEXES: Dict[str, str] = {
+    # Never used for lookups, only slowed down item inserts
+    "ix_items_description": "items",
+}
+
+
+@dataclass
+class IndexReport:
+    uncovered_patterns: List[QueryPattern] = field(default_factory=list)
+    missing_indexes: List[Index] = field(default_factory=list)
+    retired_indexes: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.uncovered_patterns or self.missing_indexes or self.retired_indexes)
+
+    def lines(self) -> List[str]:
+        lines = []
+        for pattern in self.uncovered_patterns:
+            lines.append(f"no index covers {pattern.table}({', '.join(pattern.columns)}) used by '{pattern.name}'")
+        for index in self.missing_indexes:
+            lines.append(f"declared index {index.name} on {index.table.name} is missing from the database")
+        for name in self.retired_indexes:
+            lines.append(f"retired index {name} on {RETIRED_INDEXES[name]} still exists in the database")
+        return lines
+
+
+def _declared_column_sets(table) -> List[Tuple[str, ...]]:
+    column_sets = [tuple(c.name for c in table.primary_key.columns)]
+    for index in table.indexes:
+        column_sets.append(tuple(c.name for c in index.columns))
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            column_sets.append(tuple(c.name for c in constraint.columns))
+    return column_sets
+
+
+def _covers(column_sets: List[Tuple[str, ...]], columns: Tuple[str, ...]) -> bool:
+    return any(cs[:len(columns)] == columns for cs in column_sets)
+
+
+def check_indexes(engine: Engine) -> IndexReport:
+    """Compare query patterns, declared indexes and the live database schema"""
+    report = IndexReport()
+    tables = Base.metadata.tables
+
+    for pattern in QUERY_PATTERNS:
+        table = tables.get(pattern.table)
+        if table is None or not _covers(_declared_column_sets(table), pattern.columns):
+            report.uncovered_patterns.append(pattern)
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in tables.values():
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                report.missing_indexes.append(index)
+        if table.name in RETIRED_INDEXES.values():
+            report.retired_indexes.extend(
+                name for name, owner in RETIRED_INDEXES.items()
+                if owner == table.name and name in existing
+            )
+    return report
+
+
+def apply_index_fixes(engine: Engine, report: IndexReport):
+    """Create missing declared indexes and drop retired ones"""
+    for index in report.missing_indexes:
+        logger.info(f"Creating index {index.name} on {index.table.name}")
+        index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        for name in report.retired_indexes:
+            logger.info(f"Dropping retired index {name} on {RETIRED_INDEXES[name]}")
+            # Reflected, so the dialect emits its own quoted DROP INDEX
+            # (MySQL needs the table: DROP INDEX name ON table)
+            table = Table(RETIRED_INDEXES[name], MetaData(), autoload_with=conn)
+            for index in table.indexes:
+                if index.name == name:
+                    index.drop(bind=conn, checkfirst=True)
+
+
+def log_index_report(engine: Engine):
+    """Log index problems at startup without failing the application"""
+    try:
+        report = check_indexes(engine)
+    except Exception as e:
+        logger.warning(f"Index check failed: {e}")
+        return
+    for line in report.lines():
+        logger.warning(f"Index check: {line} (run 'python manage.py check-indexes --apply')")
@@ -0,0 +1,126 @@
+"""
+Owner resolution for the records a request creates.
+
+Routes take the owner from the `current_owner_id` dependency instead of
+looking it up themselves. Until the app has authentication, every request
+resolves to a shared default user that is created at most once (when the
+schema is set up, or on first use) and then cached per process.
+
+Authentication plugs in by installing another resolver with
+set_owner_resolver(), e.g. one that returns the user id of a verified
+token, without touching the routes.
+"""
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+import models
+from services import cache
+from services.cache import response_cache
+from services.report_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+
+class OwnerResolver(ABC):
+    """Maps a request to the id of the user that owns what it creates"""
+
+    @abstractmethod
+    def resolve(self, request: Request) -> int:
+        """Id of the owning user; may raise HTTPException (e.g. 401)"""
+
+    def prepare(self):
+        """Called once the schema exists, before requests are served"""
+
+
+def get_or_create_user(db: Session, username: str, email: str) -> int:
+    """
+    Id of the user with `username`, inserting it if it doesn't exist yet.
+
+    The insert is a no-op when a concurrent worker created the user first,
+    so the user is never duplicated and no error is raised.
+    """
+    user_id = db.scalar(select(models.User.id).where(models.User.username == username))
+    if user_id is not None:
+        return user_id
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        upsert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = upsert(models.User).values(username=username, email=email).on_conflict_do_nothing()
+    else:
+        stmt = insert(models.User).values(username=username, email=email)
+    try:
+        created = db.execute(stmt).rowcount
+        if created:
+            bump_data_version(db, models.User)
+        db.commit()
+    except IntegrityError:
+        # Generic fallback lost the race to another worker
+        db.rollback()
+        created = 0
+    if created:
+        response_cache.invalidate(cache.USERS)
+        logger.info(f"Created user '{username}'")
+
+    user_id = db.scalar(select(models.User.id).where(models.User.username == username))
+    if user_id is None:
+        raise LookupError(f"Could not create user '{username}': email {email} is taken")
+    return user_id
+
+
+class DefaultOwnerResolver(OwnerResolver):
+    """Resolves every request to one shared default user, cached per process"""
+
+    def __init__(self, username: str, email: str):
+        self.username = username
+        self.email = email
+        self._owner_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def resolve(self, request: Request) -> int:
+        owner_id = self._owner_id
+        if owner_id is None:
+            with self._lock:
+                if self._owner_id is None:
+                    db = SessionLocal()
+                    try:
+                        self._owner_id = get_or_create_user(db, self.username, self.email)
+                    finally:
+                        db.close()
+                owner_id = self._owner_id
+        return owner_id
+
+    def prepare(self):
+        self._owner_id = None
+        self.resolve(None)
+
+# Global instance
+_resolver: OwnerResolver = DefaultOwnerResolver(
+    username=settings.DEFAULT_OWNER_USERNAME,
+    email=settings.DEFAULT_OWNER_EMAIL,
+)
+
+
+def get_owner_resolver() -> OwnerResolver:
+    return _resolver
+
+
+def set_owner_resolver(resolver: OwnerResolver):
+    """Install the resolver used by current_owner_id (e.g. an authenticated one)"""
+    global _resolver
+    _resolver = resolver
+
+
+def current_owner_id(request: Request) -> int:
+    """FastAPI dependency: id of the user that owns records created by this request"""
+    return _resolver.resolve(request)
@@ -1,327 +1,288 @@
+import io
+import multiprocessing
 import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
-from jinja2 import Template
-import weasyprint
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from config import settings
 from models import User, Item
-from sqlalchemy.orm import Session
-from database import get_db
+
+USER_FIELDS = ("id", "username", "email", "is_active", "created_at")
+ITEM_FIELDS = ("id", "title", "description", "completed", "owner_id", "created_at")
+
+# Chunks are numbered after merging, so their own page counter is hidden
+CHUNK_CSS = "@page { @bottom-right { content: none; } }"
+
+# WeasyPrint's default page margin (75px) in points; page numbers are
+# stamped where the @bottom-right margin box of report.css puts them
+PAGE_MARGIN = 56.25
+
+TABLE_FIELDS = {"users": USER_FIELDS, "items": ITEM_FIELDS}
+
+def _take_rows(rows: Iterator, table: str, size: int) -> List[Dict[str, Any]]:
+    # Chunks are sent to worker processes, so rows become plain dicts
+    fields = TABLE_FIELDS[table]
+    return [{field: getattr(row, field) for field in fields} for row in islice(rows, size)]
+
+def _mark_last(parts: Iterable) -> Iterator[Tuple[bool, Any]]:
+    # Looks one part ahead so the footer goes on the last one
+    parts = iter(parts)
+    current = next(parts, None)
+    while current is not None:
+        following = next(parts, None)
+        yield following is None, current
+        current = following
+
+def default_render_workers() -> int:
+    """
+    Chunk pool size when REPORT_RENDER_WORKERS is 0: the CPUs split between
+    the web workers (WEB_CONCURRENCY, 0 meaning one per CPU), since each of
+    them renders with its own pool.
+    """
+    cpus = os.cpu_count() or 1
+    return max(cpus // (settings.WEB_CONCURRENCY or cpus), 1)
+
+def _render_chunk(template_name: str, context: Dict[str, Any]) -> bytes:
+    """Render one chunk of a large report in a pool worker"""
+    return pdf_service.render_pdf(template_name, chunk=True, **context)
 
 class PDFReportService:
-    def __init__(self):
+    def __init__(self, chunk_size: int = 5000, workers: int = 0):
         self.template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
         self.ensure_template_dir()
+        # Templates are compiled once per process and the compiled bytecode
+        # is shared between processes through the bytecode cache
+        self.env = Environment(
+            loader=FileSystemLoader(self.template_dir),
+            bytecode_cache=FileSystemBytecodeCache(),
+            autoescape=select_autoescape(['html']),
+            auto_reload=False
+        )
+        # WeasyPrint (Pango/Cairo) is only loaded by the first render
+        self._stylesheets = None
+        self._stylesheets_lock = threading.Lock()
+        self.chunk_size = max(chunk_size, 1)
+        self.workers = workers or default_render_workers()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
     
     def ensure_template_dir(self):
         """Create templates directory if it doesn't exist"""
         if not os.path.exists(self.template_dir):
             os.makedirs(self.template_dir)
     
-    def generate_users_report(self, users: List[User]) -> bytes:
-        """Generate PDF report for users"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Users Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 40px; }
-        .header { text-align: center; margin-bottom: 30px; }
-        .title { color: #2c3e50; font-size: 24px; margin-bottom: 10px; }
-        .subtitle { color: #7f8c8d; font-size: 14px; margin-bottom: 20px; }
-        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
-        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
-        th { background-color: #f8f9fa; font-weight: bold; color: #2c3e50; }
-        tr:nth-child(even) { background-color: #f8f9fa; }
-        .status-active { color: #28a745; font-weight: bold; }
-        .status-inactive { color: #dc3545; font-weight: bold; }
-        .footer { text-align: center; margin-top: 30px; font-size: 12px; color: #7f8c8d; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="title">Users Report</div>
-        <div class="subtitle">Generated on {{ generation_date }}</div>
-        <div class="subtitle">Total Users: {{ total_users }}</div>
-    </div>
+    def _load_stylesheets(self):
+        # The shared stylesheet is parsed once and reused by every report
+        with self._stylesheets_lock:
+            if self._stylesheets is None:
+                import weasyprint
+                
+                with open(os.path.join(self.template_dir, 'reports', 'report.css'), encoding='utf-8') as f:
+                    stylesheet = weasyprint.CSS(string=f.read())
+                self._stylesheets = (stylesheet, weasyprint.CSS(string=CHUNK_CSS))
+            return self._stylesheets
     
-    <table>
-        <thead>
-            <tr>
-                <th>ID</th>
-                <th>Username</th>
-                <th>Email</th>
-                <th>Status</th>
-                <th>Created At</th>
-            </tr>
-        </thead>
-        <tbody>
-            {% for user in users %}
-            <tr>
-                <td>{{ user.id }}</td>
-                <td>{{ user.username }}</td>
-                <td>{{ user.email }}</td>
-                <td class="{% if user.is_active %}status-active{% else %}status-inactive{% endif %}">
-                    {{ 'Active' if user.is_active else 'Inactive' }}
-                </td>
-                <td>{{ user.created_at.strftime('%Y-%m-%d %H:%M:%S') }}</td>
-            </tr>
-            {% endfor %}
-        </tbody>
-    </table>
+    def render_pdf(self, template_name: str, chunk: bool = False, **context) -> bytes:
+        """Render a report template to PDF with the shared stylesheet"""
+        import weasyprint
+        
+        stylesheet, chunk_stylesheet = self._load_stylesheets()
+        template = self.env.get_template(f'reports/{template_name}')
+        context.setdefault('generation_date', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        html_content = template.render(**context)
+        stylesheets = [stylesheet, chunk_stylesheet] if chunk else [stylesheet]
+        return weasyprint.HTML(string=html_content).write_pdf(stylesheets=stylesheets)
     
-    <div class="footer">
-        FastAPI Vue Boilerplate - Users Report
-    </div>
-</body>
-</html>
+    def _plan_chunks(
+        self,
+        template_name: str,
+        context: Dict[str, Any],
+        report_title: str,
+        sections: List[Tuple[str, Iterable, Optional[str]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
         """
+        Split a large report into separately rendered parts, lazily.
         
-        template = Template(template_str)
-        html_content = template.render(
-            users=users,
-            total_users=len(users),
-            generation_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        )
-        
-        return weasyprint.HTML(string=html_content).write_pdf()
+        The first part is the report template itself with the first chunk of
+        the first section; every other chunk is rendered with the continuation
+        template. `sections` holds (table, rows, section title) tuples, and
+        rows are only pulled from each iterable as parts are rendered.
+        """
+        first_table, first_rows, _ = sections[0]
+        first_rows = iter(first_rows)
+        head = _take_rows(first_rows, first_table, self.chunk_size)
+        yield template_name, dict(context, **{first_table: head})
+        for index, (table, rows, section_title) in enumerate(sections):
+            rows = first_rows if index == 0 else iter(rows)
+            # Later sections start with their title, even when they are empty
+            needs_title = index > 0
+            while True:
+                chunk = _take_rows(rows, table, self.chunk_size)
+                if not chunk and not needs_title:
+                    break
+                yield 'continuation.html', {
+                    'report_title': report_title,
+                    'table': table,
+                    table: chunk,
+                    'section_title': section_title if needs_title else None,
+                }
+                needs_title = False
     
-    def generate_items_report(self, items: List[Item]) -> bytes:
-        """Generate PDF report for items"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Items Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 40px; }
-        .header { text-align: center; margin-bottom: 30px; }
-        .title { color: #2c3e50; font-size: 24px; margin-bottom: 10px; }
-        .subtitle { color: #7f8c8d; font-size: 14px; margin-bottom: 20px; }
-        .stats { display: flex; justify-content: space-around; margin: 20px 0; }
-        .stat-box { text-align: center; padding: 15px; background-color: #f8f9fa; border-radius: 8px; min-width: 120px; }
-        .stat-number { font-size: 24px; font-weight: bold; color: #42b983; }
-        .stat-label { font-size: 12px; color: #7f8c8d; margin-top: 5px; }
-        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
-        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
-        th { background-color: #f8f9fa; font-weight: bold; color: #2c3e50; }
-        tr:nth-child(even) { background-color: #f8f9fa; }
-        .status-completed { color: #28a745; font-weight: bold; }
-        .status-pending { color: #ffc107; font-weight: bold; }
-        .description { max-width: 300px; word-wrap: break-word; }
-        .footer { text-align: center; margin-top: 30px; font-size: 12px; color: #7f8c8d; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="title">Items Report</div>
-        <div class="subtitle">Generated on {{ generation_date }}</div>
-    </div>
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
     
-    <div class="stats">
-        <div class="stat-box">
-            <div class="stat-number">{{ total_items }}</div>
-            <div class="stat-label">Total Items</div>
-        </div>
-        <div class="stat-box">
-            <div class="stat-number">{{ completed_items }}</div>
-            <div class="stat-label">Completed</div>
-        </div>
-        <div class="stat-box">
-            <div class="stat-number">{{ pending_items }}</div>
-            <div class="stat-label">Pending</div>
-        </div>
-    </div>
+    def shutdown(self):
+        """Stop the chunk rendering pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
     
-    <table>
-        <thead>
-            <tr>
-                <th>ID</th>
-                <th>Title</th>
-                <th>Description</th>
-                <th>Status</th>
-                <th>Owner ID</th>
-                <th>Created At</th>
-            </tr>
-        </thead>
-        <tbody>
-            {% for item in items %}
-            <tr>
-                <td>{{ item.id }}</td>
-                <td>{{ item.title }}</td>
-                <td class="description">{{ item.description or 'No description' }}</td>
-                <td class="{% if item.completed %}status-completed{% else %}status-pending{% endif %}">
-                    {{ 'Completed' if item.completed else 'Pending' }}
-                </td>
-                <td>{{ item.owner_id }}</td>
-                <td>{{ item.created_at.strftime('%Y-%m-%d %H:%M:%S') }}</td>
-            </tr>
-            {% endfor %}
-        </tbody>
-    </table>
+    def render_chunked(self, parts: Iterable[Tuple[str, Dict[str, Any]]]) -> bytes:
+        """Render report parts in parallel and merge them into one numbered PDF"""
+        generation_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Daemonic processes (such as report job workers) can't start a pool
+        sequential = self.workers == 1 or multiprocessing.current_process().daemon
+        # Only a few chunks are in flight at once, so rows are fetched from
+        # the database about as fast as the pool renders them
+        in_flight = deque()
+        pdfs = []
+        for is_last, (name, context) in _mark_last(parts):
+            context['generation_date'] = generation_date
+            context['show_footer'] = is_last
+            if sequential:
+                pdfs.append(_render_chunk(name, context))
+                continue
+            in_flight.append(self._executor().submit(_render_chunk, name, context))
+            if len(in_flight) >= self.workers * 2:
+                pdfs.append(in_flight.popleft().result())
+        pdfs.extend(future.result() for future in in_flight)
+        return self.merge_pdfs(pdfs)
     
-    <div class="footer">
-        FastAPI Vue Boilerplate - Items Report
-    </div>
-</body>
-</html>
-        """
+    def merge_pdfs(self, pdfs: List[bytes]) -> bytes:
+        """Concatenate PDFs and stamp continuous 'Page X of N' numbers"""
+        from pypdf import PdfReader, PdfWriter
+        from reportlab.lib.colors import HexColor
+        from reportlab.pdfgen import canvas
         
-        completed_count = sum(1 for item in items if item.completed)
-        pending_count = len(items) - completed_count
+        writer = PdfWriter()
+        for pdf in pdfs:
+            writer.append(PdfReader(io.BytesIO(pdf)))
         
-        template = Template(template_str)
-        html_content = template.render(
-            items=items,
-            total_items=len(items),
-            completed_items=completed_count,
-            pending_items=pending_count,
-            generation_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        )
+        overlay = io.BytesIO()
+        stamp = canvas.Canvas(overlay)
+        total = len(writer.pages)
+        for number, page in enumerate(writer.pages, 1):
+            width, height = float(page.mediabox.width), float(page.mediabox.height)
+            stamp.setPageSize((width, height))
+            stamp.setFont('Helvetica', 7.5)
+            stamp.setFillColor(HexColor('#7f8c8d'))
+            stamp.drawRightString(width - PAGE_MARGIN, PAGE_MARGIN / 2 - 2.5, f'Page {number} of {total}')
+            stamp.showPage()
+        stamp.save()
         
-        return weasyprint.HTML(string=html_content).write_pdf()
-    
-    def generate_comprehensive_report(self, users: List[User], items: List[Item]) -> bytes:
-        """Generate comprehensive PDF report with both users and items"""
-        template_str = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>Comprehensive Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 40px; }
-        .header { text-align: center; margin-bottom: 30px; }
-        .title { color: #2c3e50; font-size: 28px; margin-bottom: 10px; }
-        .subtitle { color: #7f8c8d; font-size: 14px; margin-bottom: 20px; }
-        .section { margin-bottom: 40px; }
-        .section-title { color: #42b983; font-size: 20px; margin-bottom: 15px; border-bottom: 2px solid #42b983; padding-bottom: 5px; }
-        .stats { display: flex; justify-content: space-around; margin: 20px 0; }
-        .stat-box { text-align: center; padding: 15px; background-color: #f8f9fa; border-radius: 8px; min-width: 120px; }
-        .stat-number { font-size: 24px; font-weight: bold; color: #42b983; }
-        .stat-label { font-size: 12px; color: #7f8c8d; margin-top: 5px; }
-        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
-        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
-        th { background-color: #f8f9fa; font-weight: bold; color: #2c3e50; }
-        tr:nth-child(even) { background-color: #f8f9fa; }
-        .status-active { color: #28a745; font-weight: bold; }
-        .status-inactive { color: #dc3545; font-weight: bold; }
-        .status-completed { color: #28a745; font-weight: bold; }
-        .status-pending { color: #ffc107; font-weight: bold; }
-        .description { max-width: 300px; word-wrap: break-word; }
-        .footer { text-align: center; margin-top: 30px; font-size: 12px; color: #7f8c8d; }
-        .page-break { page-break-before: always; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="title">Comprehensive System Report</div>
-        <div class="subtitle">Generated on {{ generation_date }}</div>
-    </div>
-    
-    <div class="stats">
-        <div class="stat-box">
-            <div class="stat-number">{{ total_users }}</div>
-            <div class="stat-label">Total Users</div>
-        </div>
-        <div class="stat-box">
-            <div class="stat-number">{{ active_users }}</div>
-            <div class="stat-label">Active Users</div>
-        </div>
-        <div class="stat-box">
-            <div class="stat-number">{{ total_items }}</div>
-            <div class="stat-label">Total Items</div>
-        </div>
-        <div class="stat-box">
-            <div class="stat-number">{{ completed_items }}</div>
-            <div class="stat-label">Completed Items</div>
-        </div>
-    </div>
+        for page, numbers in zip(writer.pages, PdfReader(overlay).pages):
+            page.merge_page(numbers)
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
     
-    <div class="section">
-        <div class="section-title">Users Overview</div>
-        <table>
-            <thead>
-                <tr>
-                    <th>ID</th>
-                    <th>Username</th>
-                    <th>Email</th>
-                    <th>Status</th>
-                    <th>Created At</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for user in users %}
-                <tr>
-                    <td>{{ user.id }}</td>
-                    <td>{{ user.username }}</td>
-                    <td>{{ user.email }}</td>
-                    <td class="{% if user.is_active %}status-active{% else %}status-inactive{% endif %}">
-                        {{ 'Active' if user.is_active else 'Inactive' }}
-                    </td>
-                    <td>{{ user.created_at.strftime('%Y-%m-%d %H:%M:%S') }}</td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-    </div>
-    
-    <div class="page-break"></div>
+    def generate_users_report(
+        self,
+        users: Iterable[User],
+        total_users: Optional[int] = None,
+        summary: bool = False
+    ) -> bytes:
+        """
+        Generate PDF report for users
+        
+        `users` may be any iterable of objects with the template's columns,
+        such as streamed result rows; pass the total when it is not a list.
+        A summary report renders `users` as a sample of `total_users`.
+        """
+        if total_users is None:
+            users = list(users)
+            total_users = len(users)
+        context = {'users': users, 'total_users': total_users, 'summary': summary}
+        if summary or total_users <= self.chunk_size:
+            return self.render_pdf('users.html', **context)
+        
+        return self.render_chunked(self._plan_chunks(
+            'users.html', context, 'Users Report', [('users', users, None)]
+        ))
     
-    <div class="section">
-        <div class="section-title">Items Overview</div>
-        <table>
-            <thead>
-                <tr>
-                    <th>ID</th>
-                    <th>Title</th>
-                    <th>Description</th>
-                    <th>Status</th>
-                    <th>Owner ID</th>
-                    <th>Created At</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for item in items %}
-                <tr>
-                    <td>{{ item.id }}</td>
-                    <td>{{ item.title }}</td>
-                    <td class="description">{{ item.description or 'No description' }}</td>
-                    <td class="{% if item.completed %}status-completed{% else %}status-pending{% endif %}">
-                        {{ 'Completed' if item.completed else 'Pending' }}
-                    </td>
-                    <td>{{ item.owner_id }}</td>
-                    <td>{{ item.created_at.strftime('%Y-%m-%d %H:%M:%S') }}</td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-    </div>
+    def generate_items_report(
+        self,
+        items: Iterable[Item],
+        total_items: Optional[int] = None,
+        completed_items: Optional[int] = None,
+        summary: bool = False
+    ) -> bytes:
+        """Generate PDF report for items"""
+        if total_items is None or completed_items is None:
+            items = list(items)
+            total_items = len(items)
+            completed_items = sum(1 for item in items if item.completed)
+        
+        context = {
+            'items': items,
+            'total_items': total_items,
+            'completed_items': completed_items,
+            'pending_items': total_items - completed_items,
+            'summary': summary
+        }
+        if summary or total_items <= self.chunk_size:
+            return self.render_pdf('items.html', **context)
+        
+        return self.render_chunked(self._plan_chunks(
+            'items.html', context, 'Items Report', [('items', items, None)]
+        ))
     
-    <div class="footer">
-        FastAPI Vue Boilerplate - Comprehensive System Report
-    </div>
-</body>
-</html>
+    def generate_comprehensive_report(
+        self,
+        users: Iterable[User],
+        items: Iterable[Item],
+        totals: Optional[Dict[str, int]] = None,
+        summary: bool = False
+    ) -> bytes:
         """
+        Generate comprehensive PDF report with both users and items
         
-        active_users = sum(1 for user in users if user.is_active)
-        completed_items = sum(1 for item in items if item.completed)
+        `totals` holds total_users, active_users, total_items and
+        completed_items; it is computed from the rows when omitted.
+        """
+        if totals is None:
+            users, items = list(users), list(items)
+            totals = {
+                'total_users': len(users),
+                'active_users': sum(1 for user in users if user.is_active),
+                'total_items': len(items),
+                'completed_items': sum(1 for item in items if item.completed)
+            }
         
-        template = Template(template_str)
-        html_content = template.render(
-            users=users,
-            items=items,
-            total_users=len(users),
-            active_users=active_users,
-            total_items=len(items),
-            completed_items=completed_items,
-            generation_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        )
+        context = dict(totals, users=users, items=items, summary=summary)
+        if summary or totals['total_users'] + totals['total_items'] <= self.chunk_size:
+            return self.render_pdf('comprehensive.html', **context)
         
-        return weasyprint.HTML(string=html_content).write_pdf()
+        # The items section is rendered as continuation parts after the users
+        context.update(items=[], show_items=False)
+        return self.render_chunked(self._plan_chunks(
+            'comprehensive.html', context, 'Comprehensive System Report',
+            [('users', users, 'Users Overview'), ('items', items, 'Items Overview')]
+        ))
 
 # Global instance
-pdf_service = PDFReportService()
\ No newline at end of file
+pdf_service = PDFReportService(
+    chunk_size=settings.REPORT_CHUNK_SIZE,
+    workers=settings.REPORT_RENDER_WORKERS
+)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import settings
+import models
+
+logger = logging.getLogger(__name__)
+
+# Tables each report reads
+REPORT_SOURCES = {
+    "users": (models.User,),
+    "items": (models.Item,),
+    "comprehensive": (models.User, models.Item),
+}
+
+
+def bump_data_version(db: Session, *models_changed):
+    """Record a change to the given models' tables (caller commits)"""
+    for model in models_changed:
+        name = model.__tablename__
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(models.DataVersion).values(name=name, version=1)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": models.DataVersion.version + 1},
+            ))
+            continue
+        result = db.execute(
+            update(models.DataVersion)
+            .where(models.DataVersion.name == name)
+            .values(version=models.DataVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            db.add(models.DataVersion(name=name, version=1))
+            db.flush()
+
+
+def report_fingerprint(db: Session, report_type: str) -> Tuple[str, int]:
+    """
+    Fingerprint of the data behind a report, plus its total row count.
+
+    Combines row count and max(id) with the table's change counter, so any
+    insert, update or delete made through the API yields a new fingerprint.
+    """
+    parts = []
+    total_rows = 0
+    for model in REPORT_SOURCES[report_type]:
+        count, max_id = db.execute(select(func.count(model.id), func.max(model.id))).one()
+        version = db.scalar(
+            select(models.DataVersion.version).where(models.DataVersion.name == model.__tablename__)
+        )
+        parts.append(f"{model.__tablename__}:{count}:{max_id}:{version or 0}")
+        total_rows += count
+    return "|".join(parts), total_rows
+
+
+class ReportCache:
+    """
+    Size-bounded on-disk cache of rendered PDFs, keyed by report type and
+    data fingerprint. Reading an entry refreshes its mtime and eviction
+    removes the least recently used files once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(report_type: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{report_type}|{fingerprint}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def put(self, key: str, content: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cache_dir": self.cache_dir,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# Global instance
+report_cache = ReportCache(
+    cache_dir=settings.REPORT_CACHE_DIR,
+    max_bytes=settings.REPORT_CACHE_MAX_BYTES,
+)
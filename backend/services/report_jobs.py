@@ -0,0 +1,323 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+
+from config import settings
+from database import ReadSessionLocal, SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Worker processes are spawned, not forked, so they never inherit the
+# server's threads, event loop or open database connections
+_mp = multiprocessing.get_context("spawn")
+
+# Finished jobs are expired at most this often (seconds) per process
+EXPIRY_INTERVAL = 300
+
+
+def _render_in_subprocess(report_type: str, output_path: str, conn):
+    """Entry point of a report worker process"""
+    from services.reports import cached_report
+
+    db = ReadSessionLocal()
+    try:
+        pdf_content = cached_report(db, report_type)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_content)
+        os.replace(tmp_path, output_path)
+        conn.send((True, None))
+    except Exception as e:
+        conn.send((False, str(e)[:1000]))
+    finally:
+        db.close()
+        conn.close()
+
+
+class ReportJobQueue:
+    """
+    Runs PDF report generation outside the web server process.
+
+    Job state lives in the report_jobs table: POST inserts a queued row
+    and each dispatcher slot claims queued rows with a conditional UPDATE,
+    so several server workers can share the queue and queued jobs survive
+    restarts. The UPDATE only claims a job while fewer than `concurrency`
+    jobs are running, which caps renders across all server workers. Every
+    job renders in its own spawned process, which is terminated if it runs
+    longer than the timeout. Finished jobs and their PDFs are deleted
+    `retention` seconds after they finish.
+    """
+
+    def __init__(self, concurrency: int, timeout: float, poll_interval: float, output_dir: str,
+                 retention: float = 0):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.output_dir = output_dir
+        self.retention = retention
+        self._next_expiry = 0.0
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._processes: Dict[str, Any] = {}
+        self.running = 0
+        self.completed_total = 0
+        self.failed_total = 0
+        self.timed_out_total = 0
+
+    def start(self):
+        """Recover interrupted jobs and start the dispatcher slots"""
+        if self._threads:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._requeue_stale_jobs()
+        self._stop.clear()
+        for slot in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._run, name=f"report-job-slot-{slot}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Report job queue started with {self.concurrency} slots")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop claiming jobs, terminate running renders and put them back in the queue"""
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            interrupted = dict(self._processes)
+        for process in interrupted.values():
+            process.terminate()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if interrupted:
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(models.ReportJob)
+                    .where(models.ReportJob.id.in_(list(interrupted)))
+                    .values(status=QUEUED, started_at=None, error=None, finished_at=None)
+                )
+                db.commit()
+            finally:
+                db.close()
+            logger.info(f"Requeued {len(interrupted)} report jobs interrupted by shutdown")
+
+    def submit(self, db, report_type: str) -> models.ReportJob:
+        """Create a queued job and wake a dispatcher slot"""
+        job = models.ReportJob(id=uuid.uuid4().hex, report_type=report_type, status=QUEUED)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._wakeup.set()
+        return job
+
+    def output_path(self, job_id: str) -> str:
+        return os.path.join(self.output_dir, f"{job_id}.pdf")
+
+    def _requeue_stale_jobs(self):
+        # A job still 'running' long after the timeout belonged to a
+        # process that died; jobs of live workers are left alone
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout * 2)
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(models.ReportJob)
+                .where(models.ReportJob.status == RUNNING, models.ReportJob.started_at < cutoff)
+                .values(status=QUEUED, started_at=None)
+            )
+            db.commit()
+            if result.rowcount:
+                logger.info(f"Requeued {result.rowcount} interrupted report jobs")
+        finally:
+            db.close()
+
+    def _claim_next(self) -> Optional[models.ReportJob]:
+        db = SessionLocal()
+        try:
+            candidates = db.query(models.ReportJob.id).filter(
+                models.ReportJob.status == QUEUED
+            ).order_by(models.ReportJob.created_at).limit(self.concurrency).all()
+            # Counted inside the UPDATE so the limit holds across processes;
+            # the derived table keeps MySQL from rejecting the self-reference
+            running = select(func.count()).select_from(
+                select(models.ReportJob.id).where(models.ReportJob.status == RUNNING).subquery()
+            ).scalar_subquery()
+            for (job_id,) in candidates:
+                claimed = db.execute(
+                    update(models.ReportJob)
+                    .where(
+                        models.ReportJob.id == job_id,
+                        models.ReportJob.status == QUEUED,
+                        running < self.concurrency,
+                    )
+                    .values(status=RUNNING, started_at=datetime.utcnow())
+                ).rowcount
+                db.commit()
+                if claimed:
+                    return db.get(models.ReportJob, job_id)
+            return None
+        finally:
+            db.close()
+
+    def expire_finished_jobs(self, now: Optional[datetime] = None) -> int:
+        """Delete finished jobs older than the retention period and their PDFs"""
+        if self.retention <= 0:
+            return 0
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=self.retention)
+        finished = models.ReportJob.status.in_((COMPLETED, FAILED))
+        db = SessionLocal()
+        try:
+            expired = db.execute(
+                select(models.ReportJob.id, models.ReportJob.file_path)
+                .where(finished, models.ReportJob.finished_at < cutoff)
+            ).all()
+            for job_id, file_path in expired:
+                for path in {file_path or self.output_path(job_id), self.output_path(job_id) + ".tmp"}:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            if expired:
+                db.execute(
+                    delete(models.ReportJob)
+                    .where(models.ReportJob.id.in_([job_id for job_id, _ in expired]), finished)
+                )
+                db.commit()
+                logger.info(f"Expired {len(expired)} finished report jobs")
+            return len(expired)
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None, file_path: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(models.ReportJob)
+                .where(models.ReportJob.id == job_id)
+                .values(status=status, error=error, file_path=file_path, finished_at=datetime.utcnow())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _execute(self, job: models.ReportJob):
+        output_path = self.output_path(job.id)
+        parent_conn, child_conn = _mp.Pipe(duplex=False)
+        process = _mp.Process(
+            target=_render_in_subprocess,
+            args=(job.report_type, output_path, child_conn),
+            name=f"report-job-{job.id}",
+            # Daemonic, so it renders chunks sequentially instead of starting
+            # its own pool: up to REPORT_JOB_CONCURRENCY jobs already compete
+            # with the web workers for the CPUs
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        with self._lock:
+            self._processes[job.id] = process
+        try:
+            process.join(self.timeout)
+        finally:
+            with self._lock:
+                self._processes.pop(job.id, None)
+
+        if self._stop.is_set() and process.exitcode is not None and process.exitcode < 0:
+            # Shutdown terminated the render; stop() requeues the job
+            return
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            with self._lock:
+                self.timed_out_total += 1
+                self.failed_total += 1
+            self._finish(job.id, FAILED, error=f"Timed out after {self.timeout:g} seconds")
+            logger.error(f"Report job {job.id} timed out")
+            return
+
+        ok, error = parent_conn.recv() if parent_conn.poll() else (False, f"Worker exited with code {process.exitcode}")
+        parent_conn.close()
+        if ok:
+            with self._lock:
+                self.completed_total += 1
+            self._finish(job.id, COMPLETED, file_path=output_path)
+            logger.info(f"Report job {job.id} ({job.report_type}) completed")
+        else:
+            with self._lock:
+                self.failed_total += 1
+            self._finish(job.id, FAILED, error=error)
+            logger.error(f"Report job {job.id} failed: {error}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                logger.error(f"Failed to claim report job: {e}")
+                job = None
+            if job is None:
+                self._expire_when_due()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            with self._lock:
+                self.running += 1
+            try:
+                self._execute(job)
+            except Exception as e:
+                logger.error(f"Report job {job.id} crashed: {e}")
+                try:
+                    self._finish(job.id, FAILED, error=str(e)[:1000])
+                except Exception:
+                    # Left 'running'; picked up again by stale job recovery
+                    pass
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+    def _expire_when_due(self):
+        with self._lock:
+            if time.monotonic() < self._next_expiry:
+                return
+            self._next_expiry = time.monotonic() + EXPIRY_INTERVAL
+        try:
+            self.expire_finished_jobs()
+        except Exception as e:
+            logger.error(f"Failed to expire report jobs: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Slot usage and outcome counters for this process"""
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "running": self.running,
+                "timeout": self.timeout,
+                "completed_total": self.completed_total,
+                "failed_total": self.failed_total,
+                "timed_out_total": self.timed_out_total,
+            }
+
+# Global instance
+report_job_queue = ReportJobQueue(
+    concurrency=settings.REPORT_JOB_CONCURRENCY,
+    timeout=settings.REPORT_JOB_TIMEOUT,
+    poll_interval=settings.REPORT_JOB_POLL_INTERVAL,
+    output_dir=settings.REPORT_OUTPUT_DIR,
+    retention=settings.REPORT_JOB_RETENTION,
+)
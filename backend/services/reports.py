@@ -0,0 +1,144 @@
+from typing import Any, Iterator, List, Optional, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+import models
+from services.pdf_service import ITEM_FIELDS, USER_FIELDS, pdf_service
+from services.report_cache import ReportCache, report_cache, report_fingerprint
+
+REPORT_TYPES = ("users", "items", "comprehensive")
+
+# Rows fetched from the database cursor per round trip while rendering
+REPORT_FETCH_BATCH_SIZE = 2000
+
+DETAIL_LEVELS = ("full", "summary")
+
+# Rows per table shown by summary reports (the most recent ones)
+DEFAULT_SUMMARY_SAMPLE = 10
+MAX_SUMMARY_SAMPLE = 100
+
+# Only the columns the report templates use
+USER_COLUMNS = [getattr(models.User, field) for field in USER_FIELDS]
+ITEM_COLUMNS = [getattr(models.Item, field) for field in ITEM_FIELDS]
+
+
+class NoReportData(LookupError):
+    """Raised when the database has nothing to put in a report"""
+
+
+def stream_rows(db: Session, columns) -> Iterator[Any]:
+    """
+    Yield lightweight column tuples in id order, a batch at a time.
+
+    Rows skip the ORM identity map and are fetched with yield_per, so a
+    report only holds a batch of rows (or one render chunk) in memory.
+    """
+    result = db.execute(
+        select(*columns).order_by(columns[0]).execution_options(yield_per=REPORT_FETCH_BATCH_SIZE)
+    )
+    yield from result
+
+
+def sample_rows(db: Session, columns, limit: int) -> List[Any]:
+    """The `limit` most recent rows, newest first"""
+    return db.execute(select(*columns).order_by(columns[0].desc()).limit(limit)).all()
+
+
+def user_totals(db: Session) -> Tuple[int, int]:
+    """Total and active user counts"""
+    total, active = db.execute(
+        select(func.count(), func.sum(case((models.User.is_active, 1), else_=0)))
+        .select_from(models.User)
+    ).one()
+    return total, active or 0
+
+
+def item_totals(db: Session) -> Tuple[int, int]:
+    """Total and completed item counts"""
+    total, completed = db.execute(
+        select(func.count(), func.sum(case((models.Item.completed, 1), else_=0)))
+        .select_from(models.Item)
+    ).one()
+    return total, completed or 0
+
+
+def render_report(
+    db: Session,
+    report_type: str,
+    detail: str = "full",
+    sample: int = DEFAULT_SUMMARY_SAMPLE
+) -> bytes:
+    """
+    Stream the rows a report needs into the PDF renderer.
+
+    Summary reports keep the SQL aggregate totals but only render the
+    `sample` most recent rows of each table.
+    """
+    summary = detail == "summary"
+
+    def rows(columns):
+        return sample_rows(db, columns, sample) if summary else stream_rows(db, columns)
+
+    if report_type == "users":
+        total_users, _ = user_totals(db)
+        if not total_users:
+            raise NoReportData("No users found in the database")
+        return pdf_service.generate_users_report(rows(USER_COLUMNS), total_users, summary=summary)
+
+    if report_type == "items":
+        total_items, completed_items = item_totals(db)
+        if not total_items:
+            raise NoReportData("No items found in the database")
+        return pdf_service.generate_items_report(
+            rows(ITEM_COLUMNS), total_items, completed_items, summary=summary
+        )
+
+    if report_type == "comprehensive":
+        total_users, active_users = user_totals(db)
+        total_items, completed_items = item_totals(db)
+        if not total_users and not total_items:
+            raise NoReportData("No data found in the database")
+        totals = {
+            "total_users": total_users,
+            "active_users": active_users,
+            "total_items": total_items,
+            "completed_items": completed_items,
+        }
+        return pdf_service.generate_comprehensive_report(
+            rows(USER_COLUMNS), rows(ITEM_COLUMNS), totals, summary=summary
+        )
+
+    raise ValueError(f"Unknown report type '{report_type}'")
+
+
+def report_variant(report_type: str, detail: str = "full", sample: int = DEFAULT_SUMMARY_SAMPLE) -> str:
+    """Name of a report rendering, used in cache keys and file names"""
+    if detail == "summary":
+        return f"{report_type}_summary_{sample}"
+    return report_type
+
+
+def report_cache_key(
+    db: Session,
+    report_type: str,
+    detail: str = "full",
+    sample: int = DEFAULT_SUMMARY_SAMPLE
+) -> str:
+    """Cache key (and ETag source) for the current state of a report's data"""
+    fingerprint, _ = report_fingerprint(db, report_type)
+    return ReportCache.key(report_variant(report_type, detail, sample), fingerprint)
+
+
+def cached_report(
+    db: Session,
+    report_type: str,
+    key: Optional[str] = None,
+    detail: str = "full",
+    sample: int = DEFAULT_SUMMARY_SAMPLE
+) -> bytes:
+    """Serve a report from the PDF cache, rendering and storing it on a miss"""
+    key = key or report_cache_key(db, report_type, detail, sample)
+    pdf_content = report_cache.get(key)
+    if pdf_content is None:
+        pdf_content = render_report(db, report_type, detail, sample)
+        report_cache.put(key, pdf_content)
+    return pdf_content
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+User writes shared by the sync and async routers and the batch endpoint.
+
+Uniqueness of usernames and emails is enforced by the unique indexes on
+the users table: a new user is a single INSERT, and a duplicate surfaces
+as an IntegrityError that is mapped back to the API's error messages.
+Checking with SELECTs first costs extra round trips and still races with
+concurrent signups. The async routes on SQLite use ON CONFLICT DO NOTHING
+instead, so the driver never sees a failed statement (see async_users.py).
+"""
+from typing import Optional
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import IntegrityError
+
+import models
+import schemas
+
+# Unique columns of users, in the order duplicates are reported
+DUPLICATE_MESSAGES = {
+    "email": "Email already registered",
+    "username": "Username already taken",
+}
+
+
+def insert_user(user: schemas.UserCreate, skip_duplicates: bool = False):
+    """
+    INSERT of a new user, run with serialization.insert_returning().
+
+    With skip_duplicates (SQLite only) a taken email or username makes the
+    statement return no row instead of raising IntegrityError.
+    """
+    if skip_duplicates:
+        stmt = sqlite.insert(models.User).on_conflict_do_nothing()
+    else:
+        stmt = insert(models.User)
+    return stmt.values(**user.model_dump())
+
+
+def taken_emails(user: schemas.UserCreate):
+    """Emails of the users that clash with `user`, for duplicate_message()"""
+    return select(models.User.email).where(
+        or_(models.User.email == user.email, models.User.username == user.username)
+    )
+
+
+def duplicate_message(user: schemas.UserCreate, emails) -> str:
+    """API message for a rejected `user`, given the result of taken_emails()"""
+    return DUPLICATE_MESSAGES["email"] if user.email in emails else DUPLICATE_MESSAGES["username"]
+
+
+def duplicate_user_message(error: IntegrityError) -> Optional[str]:
+    """
+    API message for a violated users unique index, None for other errors.
+
+    Recognises SQLite ("UNIQUE constraint failed: users.email"),
+    PostgreSQL ('... constraint "ix_users_email" ... Key (email)=') and
+    MySQL ("... for key 'users.ix_users_email'") messages.
+    """
+    message = str(error.orig)
+    for column, text in DUPLICATE_MESSAGES.items():
+        if f"users.{column}" in message or f"ix_users_{column}" in message or f"({column})=" in message:
+            return text
+    return None
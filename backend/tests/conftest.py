@@ -0,0 +1,44 @@
+"""
+Shared fixtures for the backend tests.
+
+Settings are read from the environment when config is imported, so the
+test database and output directories are pointed at a scratch directory
+before any backend module is loaded. Run from backend/: python -m pytest
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+
+
+def backend_environment(scratch_dir: str, **overrides) -> dict:
+    """Environment for a backend process that only touches `scratch_dir`"""
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{scratch_dir}/app.db",
+        "REPORT_OUTPUT_DIR": f"{scratch_dir}/generated_reports",
+        "REPORT_CACHE_DIR": f"{scratch_dir}/report_cache",
+        "ACCESS_LOG_ARCHIVE_DIR": f"{scratch_dir}/archive/access_logs",
+        "REPORT_RENDER_WORKERS": "1",
+        "DATABASE_ASYNC": "false",
+    })
+    env.update(overrides)
+    return env
+
+
+os.environ.update(backend_environment(SCRATCH_DIR))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient for the app with its lifespan (schema setup, workers) running"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from database import SessionLocal
+import models
+from services import access_log_buffer
+from services.access_log_buffer import AccessLogBuffer
+
+
+def make_row(user_id, endpoint):
+    return {"user_id": user_id, "endpoint": endpoint, "method": "GET", "status_code": 200,
+            "ip_address": None, "user_agent": None, "access_time": datetime.utcnow()}
+
+
+def stored(endpoints):
+    db = SessionLocal()
+    try:
+        return {e for (e,) in db.query(models.UserAccess.endpoint).filter(models.UserAccess.endpoint.in_(endpoints))}
+    finally:
+        db.close()
+
+
+def test_bad_rows_are_dropped_alone(client):
+    buffer = AccessLogBuffer(batch_size=100, flush_interval=1, max_size=100)
+    endpoints = [f"/bisect/{i}" for i in range(10)]
+    # user_id is NOT NULL, so rows 3 and 7 fail the batch INSERT
+    rows = [make_row(None if i in (3, 7) else 1, endpoint) for i, endpoint in enumerate(endpoints)]
+
+    assert buffer._write(rows) == 8
+    assert stored(endpoints) == set(endpoints) - {endpoints[3], endpoints[7]}
+    assert buffer.stats()["failed_total"] == 2
+    assert buffer.stats()["flushed_total"] == 8
+
+
+def locked_then(buffer, monkeypatch, failures):
+    """Make _insert fail with a locked database `failures` times, then write for real"""
+    attempts = []
+    insert = buffer._insert
+
+    def flaky(rows):
+        attempts.append(len(rows))
+        if len(attempts) <= failures:
+            return OperationalError("INSERT", {}, Exception("database is locked"))
+        return insert(rows)
+
+    monkeypatch.setattr(access_log_buffer, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(buffer, "_insert", flaky)
+    return attempts
+
+
+def test_transient_errors_are_retried(client, monkeypatch):
+    buffer = AccessLogBuffer(batch_size=100, flush_interval=1, max_size=100, retries=3)
+    attempts = locked_then(buffer, monkeypatch, failures=2)
+    endpoints = [f"/locked/{i}" for i in range(4)]
+
+    assert buffer._write([make_row(1, endpoint) for endpoint in endpoints]) == 4
+    assert attempts == [4, 4, 4]
+    assert stored(endpoints) == set(endpoints)
+    assert buffer.stats()["retried_total"] == 2
+    assert buffer.stats()["failed_total"] == 0
+
+
+def test_connection_errors_fail_the_batch_after_the_last_retry(client, monkeypatch):
+    buffer = AccessLogBuffer(batch_size=100, flush_interval=1, max_size=100, retries=2)
+    attempts = locked_then(buffer, monkeypatch, failures=10)
+
+    assert buffer._write([make_row(1, f"/down/{i}") for i in range(4)]) == 0
+    # Not bisected: the error says nothing about individual rows
+    assert attempts == [4, 4, 4]
+    assert buffer.stats()["failed_total"] == 4
@@ -0,0 +1,176 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select, text
+
+from database import SessionLocal
+import models
+from services.access_log_buffer import write_access_logs
+from services.access_partitions import (
+    HOT_TABLE,
+    PARTITION_PREFIX,
+    apply_retention,
+    list_partitions,
+    month_start,
+    rotate_access_logs,
+)
+from services.access_rollups import read_breakdowns
+
+# Far beyond the users the other tests create, so each test owns its rows
+USER_IDS = iter(range(900001, 901000))
+
+
+@pytest.fixture
+def user_id(client):
+    return next(USER_IDS)
+
+
+def add_rows(user_id, stored_times):
+    """Insert access rows with access_time stored verbatim, like the server default writes it"""
+    db = SessionLocal()
+    try:
+        for stored in stored_times:
+            db.execute(
+                text("INSERT INTO user_access (user_id, endpoint, access_time) VALUES (:user_id, '/paging', :t)"),
+                {"user_id": user_id, "t": stored},
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def page_all(client, path, limit):
+    ids, cursor = [], None
+    for _ in range(50):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        ids.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+    pytest.fail(f"Paging {path} did not finish: {ids[:20]}")
+
+
+def expected_ids(user_id):
+    db = SessionLocal()
+    try:
+        rows = db.query(models.UserAccess.id, models.UserAccess.access_time).filter(
+            models.UserAccess.user_id == user_id
+        ).all()
+    finally:
+        db.close()
+    return [row.id for row in sorted(rows, key=lambda row: (row.access_time, row.id), reverse=True)]
+
+
+def test_cursor_pages_over_equal_timestamps(client, user_id):
+    # Six rows in the same second, stored without fractional seconds
+    add_rows(user_id, ["2026-10-17 13:39:04"] * 6)
+    ids = page_all(client, f"/api/dashboard/user-access/{user_id}", 2)
+    assert ids == sorted(ids, reverse=True)
+    assert len(ids) == 6 == len(set(ids))
+
+
+def test_cursor_pages_mix_stored_formats(client, user_id):
+    add_rows(user_id, ["2026-10-17 13:39:04", "2026-10-17 13:39:04.250000", "2026-10-17 13:39:03",
+                       "2026-10-17 13:39:05", "2026-10-17 13:39:04"])
+    ids = page_all(client, f"/api/dashboard/user-access/{user_id}", 2)
+    assert len(ids) == 5 == len(set(ids))
+
+
+def test_recent_access_cursor_terminates(client, user_id):
+    add_rows(user_id, ["2026-10-17 13:39:04"] * 6)
+    ids = page_all(client, "/api/dashboard/recent-access", 2)
+    assert len(ids) == len(set(ids))
+    assert set(expected_ids(user_id)) <= set(ids)
+
+
+def test_cursor_pages_across_monthly_partitions(client, user_id):
+    this_month = month_start(datetime.utcnow())
+    last_month = month_start(this_month - timedelta(days=1))
+    two_months_ago = month_start(last_month - timedelta(days=1))
+    stamp = lambda month, day: (month + timedelta(days=day)).strftime("%Y-%m-%d %H:%M:%S")
+    add_rows(user_id, [stamp(two_months_ago, 3)] * 3 + [stamp(last_month, 5)] * 3 + [stamp(last_month, 9)])
+    add_rows(user_id, [stamp(this_month, 0)] * 2)
+
+    db = SessionLocal()
+    try:
+        rotated = rotate_access_logs(db)
+        db.commit()
+    finally:
+        db.close()
+    assert {two_months_ago.strftime("%Y%m"), last_month.strftime("%Y%m")} <= set(rotated)
+
+    ids = page_all(client, f"/api/dashboard/user-access/{user_id}", 2)
+    assert len(ids) == 9 == len(set(ids))
+    # Pages run newest first: this month, then last month, then the month before
+    assert ids[:2] == sorted(ids[:2], reverse=True)
+    assert ids[-3:] == sorted(ids[-3:], reverse=True)
+
+    legacy = page_all(client, f"/api/dashboard/user-access/{user_id}?skip=4", 2)
+    assert legacy == ids[4:]
+
+
+def test_rotation_keeps_rows_written_during_the_copy(client, user_id):
+    last_month = month_start(month_start(datetime.utcnow()) - timedelta(days=1))
+    stored = (last_month + timedelta(days=2)).strftime("%Y-%m-%d %H:%M:%S")
+    add_rows(user_id, [stored] * 2)
+
+    db = SessionLocal()
+    connection = db.connection()
+    late = []
+
+    def write_late_row(conn, cursor, statement, parameters, context, executemany):
+        # Another request's row for the same month lands between copy and delete
+        if not late and statement.startswith(f"INSERT INTO {PARTITION_PREFIX}"):
+            late.append(conn.execute(
+                text("INSERT INTO user_access (user_id, endpoint, access_time) VALUES (:user_id, '/late', :t)"),
+                {"user_id": user_id, "t": stored},
+            ).lastrowid)
+
+    event.listen(connection, "after_cursor_execute", write_late_row)
+    try:
+        rotate_access_logs(db)
+        db.commit()
+    finally:
+        event.remove(connection, "after_cursor_execute", write_late_row)
+        db.close()
+
+    assert late
+    ids = page_all(client, f"/api/dashboard/user-access/{user_id}", 10)
+    assert len(ids) == 3 and late[0] in ids
+
+    db = SessionLocal()
+    try:
+        rotate_access_logs(db)
+        db.commit()
+        assert db.scalar(select(func.count()).select_from(HOT_TABLE).where(HOT_TABLE.c.user_id == user_id)) == 0
+    finally:
+        db.close()
+    assert sorted(page_all(client, f"/api/dashboard/user-access/{user_id}", 10)) == sorted(ids)
+
+
+def test_retention_archives_and_drops_old_partitions(client, user_id, tmp_path):
+    db = SessionLocal()
+    try:
+        write_access_logs(db, [
+            {"user_id": user_id, "endpoint": "/retention", "access_time": datetime(2001, 3, day, 12)}
+            for day in (1, 2, 3)
+        ])
+        db.commit()
+        assert "200103" in rotate_access_logs(db)
+        db.commit()
+        assert read_breakdowns(db)["endpoint"]["/retention"] == 3
+
+        assert "200103" in apply_retention(db, retention_months=6, archive_dir=str(tmp_path))
+        assert "200103" not in list_partitions(db)
+        assert "/retention" not in read_breakdowns(db)["endpoint"]
+    finally:
+        db.close()
+
+    with gzip.open(tmp_path / f"{PARTITION_PREFIX}200103.ndjson.gz", "rt") as archive:
+        records = [json.loads(line) for line in archive]
+    assert [record["endpoint"] for record in records] == ["/retention"] * 3
+    assert [record["user_id"] for record in records] == [user_id] * 3
@@ -0,0 +1,57 @@
+import database
+
+
+def test_batch_keeps_read_your_writes_cookie(client, monkeypatch):
+    # get_db only sets the cookie when replicas are configured
+    monkeypatch.setattr(database, "replica_engines", [object()])
+    for path, body in (
+        ("/api/items/batch", {"create": [{"title": "cookie"}]}),
+        ("/api/users/batch", {"create": [{"username": "cookie", "email": "cookie@example.com"}]}),
+    ):
+        response = client.post(path, json=body)
+        assert response.status_code == 200
+        assert database.PRIMARY_COOKIE in response.cookies
+        assert response.headers["content-type"] == "application/json"
+    client.cookies.clear()
+
+
+def test_batch_replay_is_marked(client):
+    body = {"create": [{"title": "replayed"}]}
+    headers = {"Idempotency-Key": "replay-test"}
+    first = client.post("/api/items/batch", json=body, headers=headers)
+    second = client.post("/api/items/batch", json=body, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+
+
+def test_batch_update_rejects_null_for_required_fields(client):
+    item_id = client.post("/api/items/batch", json={"create": [{"title": "keep"}]}).json()["results"][0]["id"]
+    for path, row in (
+        ("/api/items/batch", {"id": item_id, "title": None}),
+        ("/api/items/batch", {"id": item_id, "completed": None}),
+        ("/api/users/batch", {"id": 1, "email": None}),
+        ("/api/users/batch", {"id": 1, "is_active": None}),
+    ):
+        assert client.post(path, json={"update": [row]}).status_code == 422
+    assert client.put(f"/api/items/{item_id}", json={"title": None}).status_code == 422
+
+    # Nullable fields can still be cleared, omitted ones are left alone
+    response = client.post("/api/items/batch", json={"update": [{"id": item_id, "description": None}]})
+    assert response.status_code == 200
+    assert client.get(f"/api/items/{item_id}").json()["title"] == "keep"
+
+
+def test_batch_conflict_hides_driver_errors(client, monkeypatch):
+    from services import batch
+
+    client.post("/api/users/batch", json={"create": [{"username": "taken", "email": "taken@example.com"}]})
+    # Simulate a concurrent signup landing between the lookups and the insert
+    lookup = batch._lookup
+    monkeypatch.setattr(batch, "_lookup", lambda db, columns, column, values: (
+        [] if column.key in ("email", "username") else lookup(db, columns, column, values)
+    ))
+    response = client.post("/api/users/batch", json={"create": [{"username": "taken", "email": "other@example.com"}]})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Batch conflicts with the current data, nothing was applied"
@@ -0,0 +1,35 @@
+"""Run each benchmark at a tiny size so the scripts keep working"""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR, backend_environment
+
+BENCHMARKS = [
+    ("dashboard_stats", ["--access-rows", "2000", "--users", "50", "--items", "100",
+                         "--contacts", "20", "--repeat", "2"]),
+    ("list_serialization", ["--rows", "200", "--repeat", "2"]),
+    ("sqlite_profile", ["--writers", "1", "--readers", "1", "--seconds", "0.5", "--seed-items", "100"]),
+    ("report_setup", ["--repeat", "2"]),
+    ("chunked_render", ["--rows", "30", "--chunk-size", "10", "--workers", "2"]),
+    ("concurrent_signups", ["--threads", "2", "--signups", "5"]),
+]
+NEEDS_WEASYPRINT = {"report_setup", "chunked_render"}
+
+
+@pytest.mark.parametrize("name, args", BENCHMARKS, ids=[name for name, _ in BENCHMARKS])
+def test_benchmark_runs(tmp_path, name, args):
+    if name in NEEDS_WEASYPRINT:
+        try:
+            import weasyprint  # noqa: F401
+        except (ImportError, OSError) as e:
+            # OSError: installed, but Pango/Cairo are missing
+            pytest.skip(f"WeasyPrint is not usable: {e}")
+    result = subprocess.run(
+        [sys.executable, "-m", f"benchmarks.{name}", *args],
+        cwd=BACKEND_DIR, env=backend_environment(str(tmp_path)),
+        capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip()
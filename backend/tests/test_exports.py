@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from routers import exports
+
+
+def test_users_export_streams_every_row_as_csv(client, monkeypatch):
+    # Small batches so the export spans several cursor round trips
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 2)
+    for n in range(5):
+        client.post("/api/users/", json={"username": f"exported{n}", "email": f"exported{n}@example.com"})
+
+    response = client.get("/api/exports/users")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == "attachment; filename=users.csv"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert {f"exported{n}" for n in range(5)} <= {row["username"] for row in rows}
+    ids = [int(row["id"]) for row in rows]
+    assert ids == sorted(ids)
+    assert ids == [user["id"] for user in client.get("/api/users/", params={"limit": 1000}).json()]
+
+
+def test_access_log_export_as_ndjson_in_a_time_window(client):
+    since = datetime.utcnow() - timedelta(seconds=1)
+    body = "\n".join(json.dumps({"user_id": 7, "endpoint": f"/exported/{n}"}) for n in range(3))
+    client.post(
+        "/api/dashboard/log-access/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    response = client.get(
+        "/api/exports/access-logs",
+        params={"format": "ndjson", "since": since.isoformat()},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert {f"/exported/{n}" for n in range(3)} <= {record["endpoint"] for record in records}
+    assert all(datetime.fromisoformat(record["access_time"]) >= since for record in records)
+
+    until = client.get(
+        "/api/exports/access-logs",
+        params={"format": "ndjson", "since": since.isoformat(), "until": since.isoformat()},
+    )
+    assert until.text == ""
+
+
+def test_unknown_export_format_is_rejected(client):
+    response = client.get("/api/exports/items", params={"format": "xml"})
+    assert response.status_code == 400
+    assert "csv, ndjson" in response.json()["detail"]
@@ -0,0 +1,20 @@
+from sqlalchemy import inspect, text
+
+from database import engine
+from services.index_advisor import apply_index_fixes, check_indexes
+
+
+def test_missing_and_retired_indexes_are_fixed(client):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_items_description ON items (description)"))
+        conn.execute(text("DROP INDEX ix_users_email"))
+
+    report = check_indexes(engine)
+    assert report.retired_indexes == ["ix_items_description"]
+    assert [index.name for index in report.missing_indexes] == ["ix_users_email"]
+    assert not report.uncovered_patterns
+
+    apply_index_fixes(engine, report)
+    assert check_indexes(engine).ok
+    assert "ix_items_description" not in {index["name"] for index in inspect(engine).get_indexes("items")}
+
@@ -0,0 +1,51 @@
+"""Creates without INSERT ... RETURNING, as on MySQL"""
+import pytest
+from sqlalchemy import event
+
+import database
+
+
+@pytest.fixture
+def no_returning(monkeypatch):
+    dialect = database.engine.dialect
+    for flag in ("insert_returning", "insert_executemany_returning",
+                 "insert_executemany_returning_sort_by_parameter_order"):
+        monkeypatch.setattr(dialect, flag, False)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(database.engine, "before_cursor_execute", record)
+
+
+def test_create_reads_the_new_row_back(client, no_returning):
+    item = client.post("/api/items/", json={"title": "no returning"})
+    assert item.status_code == 201
+    assert client.get(f"/api/items/{item.json()['id']}").json() == item.json()
+
+    user = client.post("/api/users/", json={"username": "noret", "email": "noret@example.com"})
+    assert user.status_code == 200
+    assert user.json()["username"] == "noret"
+    duplicate = client.post("/api/users/", json={"username": "noret", "email": "noret2@example.com"})
+    assert duplicate.status_code == 400
+
+    assert not [s for s in no_returning if "RETURNING" in s.upper()]
+
+
+def test_batch_ids_follow_input_order(client, no_returning):
+    titles = [f"ordered {i}" for i in range(5)]
+    results = client.post("/api/items/batch", json={"create": [{"title": t} for t in titles]}).json()["results"]
+    for title, result in zip(titles, results):
+        assert client.get(f"/api/items/{result['id']}").json()["title"] == title
+
+    client.post("/api/users/batch", json={"create": [{"username": "upserted", "email": "old@example.com"}]})
+    results = client.post("/api/users/batch", json={"upsert": True, "create": [
+        {"username": "fresh", "email": "fresh@example.com"},
+        {"username": "upserted", "email": "new@example.com"},
+    ]}).json()["results"]
+    assert [r["status"] for r in results] == ["created", "updated"]
+    assert client.get(f"/api/users/{results[1]['id']}").json()["email"] == "new@example.com"
+    assert not [s for s in no_returning if "RETURNING" in s.upper()]
@@ -0,0 +1,27 @@
+import pytest
+
+from services.owners import OwnerResolver, get_owner_resolver, set_owner_resolver
+
+
+def test_resolver_without_resolve_cannot_be_created():
+    class Incomplete(OwnerResolver):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_installed_resolver_owns_new_items(client):
+    owner_id = client.post("/api/users/", json={"username": "owner", "email": "owner@example.com"}).json()["id"]
+
+    class Fixed(OwnerResolver):
+        def resolve(self, request):
+            return owner_id
+
+    default = get_owner_resolver()
+    set_owner_resolver(Fixed())
+    try:
+        item = client.post("/api/items/", json={"title": "owned"}).json()
+    finally:
+        set_owner_resolver(default)
+    assert item["owner_id"] == owner_id
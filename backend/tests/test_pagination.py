@@ -0,0 +1,45 @@
+import pytest
+
+from pagination import page_rows
+
+
+@pytest.mark.parametrize("path", [
+    "/api/items/",
+    "/api/users/",
+    "/api/contact/",
+    "/api/dashboard/recent-access",
+    "/api/dashboard/user-access/1",
+])
+@pytest.mark.parametrize("limit", [0, -1])
+def test_list_endpoints_reject_non_positive_limits(client, path, limit):
+    response = client.get(path, params={"limit": limit})
+    assert response.status_code == 422
+
+
+def test_list_endpoints_reject_negative_skip(client):
+    assert client.get("/api/items/", params={"skip": -1}).status_code == 422
+
+
+def test_cursor_pages_cover_every_row(client):
+    created = client.post("/api/items/batch", json={
+        "create": [{"title": f"page {i}"} for i in range(5)]
+    })
+    assert created.status_code == 200
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/items/", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(set(seen))
+    assert len(seen) >= 5
+
+
+def test_page_rows_with_empty_page():
+    assert page_rows([1, 2], 0) == ([], True)
+    assert page_rows([1, 2, 3], 2) == ([1, 2], True)
+    assert page_rows([1], 2) == ([1], False)
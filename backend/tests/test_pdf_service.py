@@ -0,0 +1,30 @@
+import pytest
+
+from config import settings
+from services import pdf_service as module
+from services.pdf_service import PDFReportService
+
+
+@pytest.mark.parametrize("cpus, web_workers, expected", [
+    (8, 0, 1),   # one web worker per CPU
+    (8, 2, 4),
+    (8, 16, 1),
+    (1, 0, 1),
+])
+def test_default_workers_share_the_cpus(monkeypatch, cpus, web_workers, expected):
+    monkeypatch.setattr(module.os, "cpu_count", lambda: cpus)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", web_workers)
+    assert PDFReportService(workers=0).workers == expected
+
+
+def test_explicit_workers_are_kept():
+    assert PDFReportService(workers=3).workers == 3
+
+
+def test_daemonic_job_processes_render_without_a_pool(monkeypatch):
+    service = PDFReportService(workers=4)
+    monkeypatch.setattr(module.multiprocessing.current_process(), "daemon", True)
+    monkeypatch.setattr(module, "_render_chunk", lambda name, context: name.encode())
+    monkeypatch.setattr(service, "merge_pdfs", lambda pdfs: b"".join(pdfs))
+    assert service.render_chunked([("a", {}), ("b", {})]) == b"ab"
+    assert service._pool is None
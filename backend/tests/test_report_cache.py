@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from routers import reports as router
+from services.report_cache import ReportCache
+
+
+@pytest.fixture
+def rendered(client, monkeypatch):
+    """Stand-in for cached_report that records the keys it was asked for"""
+    keys = []
+
+    def cached_report(db, report_type, key, detail, sample):
+        keys.append(key)
+        return b"%PDF-1.7 " + key.encode()
+
+    monkeypatch.setattr(router, "cached_report", cached_report)
+    return keys
+
+
+@pytest.mark.parametrize("header", [
+    "{etag}",
+    "W/{etag}",
+    '"other", {etag}',
+    '"other",W/{etag} ',
+    "*",
+])
+def test_matching_if_none_match_returns_304(client, rendered, header):
+    etag = client.get("/api/reports/users").headers["etag"]
+    response = client.get("/api/reports/users", headers={"If-None-Match": header.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert len(rendered) == 1
+
+
+@pytest.mark.parametrize("header", ['"other"', "{prefix}", '"x{etag}"'])
+def test_other_tags_get_the_report(client, rendered, header):
+    etag = client.get("/api/reports/users").headers["etag"]
+    # A tag that merely contains (or is contained in) the current one is a different tag
+    header = header.format(etag=etag.strip('"'), prefix=etag[:-5] + '"')
+    response = client.get("/api/reports/users", headers={"If-None-Match": header})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+
+
+def test_writes_change_the_etag(client, rendered):
+    before = client.get("/api/reports/items").headers["etag"]
+    item = client.post("/api/items/", json={"title": "etag"}).json()
+    after_insert = client.get("/api/reports/items").headers["etag"]
+    client.put(f"/api/items/{item['id']}", json={"completed": True})
+    after_update = client.get("/api/reports/items").headers["etag"]
+    # Same count and max(id) as after the update: only the change counter differs
+    assert len({before, after_insert, after_update}) == 3
+    assert client.get("/api/reports/items", headers={"If-None-Match": before}).status_code == 200
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ReportCache(str(tmp_path), max_bytes=25)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    assert cache.get("a") == b"a" * 10
+    # Make b the least recently used even with coarse mtimes
+    os.utime(tmp_path / "b.pdf", (0, 0))
+    cache.put("c", b"c" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 10 and cache.get("c") == b"c" * 10
+    assert cache.stats()["evictions"] == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (3, 1)
@@ -0,0 +1,67 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import SessionLocal
+import models
+from services.report_jobs import COMPLETED, QUEUED, RUNNING, ReportJobQueue
+
+
+@pytest.fixture
+def db(client):
+    session = SessionLocal()
+    session.query(models.ReportJob).delete()
+    session.commit()
+    yield session
+    session.query(models.ReportJob).delete()
+    session.commit()
+    session.close()
+
+
+def make_queue(tmp_path, **options):
+    return ReportJobQueue(concurrency=2, timeout=60, poll_interval=1, output_dir=str(tmp_path), **options)
+
+
+def add_job(db, status=QUEUED, **fields):
+    job = models.ReportJob(id=uuid.uuid4().hex, report_type="users", status=status, **fields)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_concurrency_limit_holds_across_processes(db, tmp_path):
+    for _ in range(4):
+        add_job(db)
+    # Two server processes, each with its own queue instance
+    first, second = make_queue(tmp_path), make_queue(tmp_path)
+    assert first._claim_next() is not None
+    assert second._claim_next() is not None
+    assert first._claim_next() is None
+    assert second._claim_next() is None
+    assert db.query(models.ReportJob).filter_by(status=RUNNING).count() == 2
+
+
+def test_finished_jobs_expire_with_their_files(db, tmp_path):
+    queue = make_queue(tmp_path, retention=3600)
+    now = datetime.utcnow()
+    old = add_job(db, status=COMPLETED, finished_at=now - timedelta(hours=2))
+    recent = add_job(db, status=COMPLETED, finished_at=now - timedelta(minutes=5))
+    queued = add_job(db)
+    for job_id in (old, recent):
+        with open(queue.output_path(job_id), "wb") as f:
+            f.write(b"%PDF")
+    db.query(models.ReportJob).filter_by(id=old).update({"file_path": queue.output_path(old)})
+    db.commit()
+
+    assert queue.expire_finished_jobs(now) == 1
+    db.expire_all()
+    assert {job.id for job in db.query(models.ReportJob)} == {recent, queued}
+    assert not os.path.exists(queue.output_path(old))
+    assert os.path.exists(queue.output_path(recent))
+
+
+def test_retention_zero_keeps_jobs(db, tmp_path):
+    add_job(db, status=COMPLETED, finished_at=datetime.utcnow() - timedelta(days=30))
+    assert make_queue(tmp_path, retention=0).expire_finished_jobs() == 0
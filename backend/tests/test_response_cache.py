@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from services import cache as module
+from services.cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def counter():
+    calls = []
+
+    def compute():
+        calls.append(len(calls) + 1)
+        return len(calls)
+    return compute, calls
+
+
+def wait_for_refresh(cache):
+    for _ in range(200):
+        if not cache._refreshing:
+            return
+        time.sleep(0.01)
+    pytest.fail("Background refresh did not finish")
+
+
+def test_fresh_entries_are_served_from_the_cache(clock):
+    cache = ResponseCache(ttl=10, stale_ttl=30)
+    compute, calls = counter()
+    assert cache.get_or_compute("stats", compute) == 1
+    clock[0] += 9
+    assert cache.get_or_compute("stats", compute) == 1
+    assert calls == [1]
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_expired_entries_are_served_stale_while_refreshing(clock):
+    cache = ResponseCache(ttl=10, stale_ttl=30)
+    compute, calls = counter()
+    cache.get_or_compute("stats", compute)
+    clock[0] += 20
+    assert cache.get_or_compute("stats", compute) == 1
+    wait_for_refresh(cache)
+    assert cache.get_or_compute("stats", compute) == 2
+    assert cache.stats()["stale_hits"] == 1
+
+    # Past ttl + stale_ttl the caller waits for a new value
+    clock[0] += 41
+    assert cache.get_or_compute("stats", compute) == 3
+
+
+def test_invalidate_drops_tagged_entries_only(clock):
+    cache = ResponseCache(ttl=10, stale_ttl=30)
+    compute, _ = counter()
+    cache.get_or_compute("users", compute, tags=("users",))
+    cache.get_or_compute("items", compute, tags=("items",))
+    cache.invalidate("users")
+    assert cache.get_or_compute("users", compute, tags=("users",)) == 3
+    assert cache.get_or_compute("items", compute, tags=("items",)) == 2
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+
+
+def test_results_computed_before_a_write_are_not_stored(clock):
+    cache = ResponseCache(ttl=10, stale_ttl=30)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "before the write"
+
+    reader = threading.Thread(target=cache.get_or_compute, args=("stats", slow, ("users",)))
+    reader.start()
+    started.wait(5)
+    cache.invalidate("users")
+    release.set()
+    reader.join(5)
+    assert cache.get_or_compute("stats", lambda: "after the write", tags=("users",)) == "after the write"
+
+
+def test_writes_invalidate_the_dashboard_stats(client):
+    before = client.get("/api/dashboard/stats").json()
+    response = client.post("/api/contact/", json={
+        "name": "Cache", "email": "cache@example.com", "subject": "Stats", "message": "Invalidate me"
+    })
+    assert response.status_code == 200
+    # Well within CACHE_TTL, so only the invalidation can explain the new count
+    assert client.get("/api/dashboard/stats").json()["total_contacts"] == before["total_contacts"] + 1
@@ -0,0 +1,102 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from database import SessionLocal
+import models
+from services.access_partitions import access_log_tables
+from services.access_rollups import (
+    DIMENSIONS,
+    read_breakdowns,
+    read_recent_count,
+    rebuild_access_rollups,
+)
+
+
+def breakdowns():
+    db = SessionLocal()
+    try:
+        return read_breakdowns(db)
+    finally:
+        db.close()
+
+
+def recent_count(since):
+    db = SessionLocal()
+    try:
+        return read_recent_count(db, since)
+    finally:
+        db.close()
+
+
+def log_bulk(client, records):
+    body = "\n".join(json.dumps(record) for record in records)
+    response = client.post(
+        "/api/dashboard/log-access/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_bulk_writes_update_the_counters(client):
+    since = datetime.utcnow()
+    before, recent_before = breakdowns(), recent_count(since)
+    log_bulk(client, [
+        {"user_id": 1, "endpoint": "/rollups/a", "method": "GET", "status_code": 200},
+        {"user_id": 1, "endpoint": "/rollups/a", "method": "GET", "status_code": 404},
+        {"user_id": 2, "endpoint": "/rollups/b", "method": "POST", "status_code": 200},
+    ])
+    after = breakdowns()
+
+    def delta(dimension, key):
+        return after[dimension].get(key, 0) - before[dimension].get(key, 0)
+
+    assert delta("endpoint", "/rollups/a") == 2
+    assert delta("endpoint", "/rollups/b") == 1
+    assert delta("method", "GET") == 2
+    assert delta("method", "POST") == 1
+    assert delta("status", "200") == 2
+    assert delta("status", "404") == 1
+    assert recent_count(since) - recent_before == 3
+
+
+def test_deleting_an_access_log_decrements_the_counters(client):
+    log_bulk(client, [{"user_id": 3, "endpoint": "/rollups/delete", "method": "DELETE"}])
+    db = SessionLocal()
+    try:
+        access_id = db.scalar(
+            select(func.max(models.UserAccess.id)).where(models.UserAccess.endpoint == "/rollups/delete")
+        )
+    finally:
+        db.close()
+    before = breakdowns()
+
+    assert client.delete(f"/api/dashboard/access/{access_id}").status_code == 200
+    after = breakdowns()
+    assert before["endpoint"]["/rollups/delete"] - after["endpoint"].get("/rollups/delete", 0) == 1
+    assert before["method"]["DELETE"] - after["method"].get("DELETE", 0) == 1
+
+
+def test_rebuild_matches_a_full_scan(client):
+    log_bulk(client, [{"user_id": 4, "endpoint": "/rollups/rebuild", "method": "PUT", "status_code": 201}])
+    db = SessionLocal()
+    try:
+        expected = {dimension: Counter() for dimension in DIMENSIONS}
+        total = 0
+        for table in access_log_tables(db):
+            for row in db.execute(select(*[table.c[column] for column in DIMENSIONS.values()])).mappings():
+                total += 1
+                for dimension, column in DIMENSIONS.items():
+                    if row[column] is not None:
+                        expected[dimension][str(row[column])] += 1
+
+        assert rebuild_access_rollups(db) == total
+        db.commit()
+        assert read_breakdowns(db) == {dimension: dict(counts) for dimension, counts in expected.items()}
+        assert read_recent_count(db, datetime.utcnow() - timedelta(days=3650)) >= 1
+    finally:
+        db.close()
@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND_DIR, backend_environment
+
+SIGNUPS = 20
+
+# Runs in a fresh interpreter: DATABASE_ASYNC picks the routers at import
+CONCURRENT_SIGNUPS = """
+import json, threading
+from fastapi.testclient import TestClient
+from main import app
+
+statuses = []
+with TestClient(app) as client:
+    def signup():
+        response = client.post("/api/users/", json={"username": "racer", "email": "racer@example.com"})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=signup) for _ in range(%d)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    users = [u for u in client.get("/api/users/").json() if u["username"] == "racer"]
+print(json.dumps({"statuses": statuses, "users": len(users)}))
+""" % SIGNUPS
+
+
+@pytest.mark.parametrize("async_routers", ["false", "true"])
+def test_concurrent_signups_create_one_user(tmp_path, async_routers):
+    output = subprocess.run(
+        [sys.executable, "-c", CONCURRENT_SIGNUPS],
+        cwd=BACKEND_DIR, env=backend_environment(str(tmp_path), DATABASE_ASYNC=async_routers),
+        capture_output=True, text=True, check=True, timeout=120,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert sorted(result["statuses"]) == [200] + [400] * (SIGNUPS - 1)
+    assert result["users"] == 1
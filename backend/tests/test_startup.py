@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR, backend_environment
+
+# Generous enough for a cold CI runner; most of it is FastAPI and pydantic
+IMPORT_BUDGET_SECONDS = 3.0
+HEAVY_MODULES = ("weasyprint", "pypdf", "reportlab")
+
+IMPORT_MAIN = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "loaded": sorted(
+    name for name in sys.modules if name.split(".")[0] in %r
+)}))
+""" % (HEAVY_MODULES,)
+
+
+def import_main(scratch_dir):
+    # A fresh interpreter, so modules imported by other tests don't count
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_MAIN],
+        cwd=BACKEND_DIR, env=backend_environment(str(scratch_dir)),
+        capture_output=True, text=True, check=True, timeout=60,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_main_skips_pdf_engines(tmp_path):
+    assert import_main(tmp_path)["loaded"] == []
+
+
+def test_import_main_within_budget(tmp_path):
+    assert import_main(tmp_path)["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_import_main_does_not_touch_the_database(tmp_path):
+    import_main(tmp_path)
+    assert not (tmp_path / "app.db").exists()
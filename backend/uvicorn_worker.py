@@ -0,0 +1,7 @@
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools (from uvicorn[standard])"""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
\ No newline at end of file
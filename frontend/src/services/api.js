@@ -2,6 +2,9 @@ import axios from 'axios'
 
 const api = axios.create({
   baseURL: 'http://localhost:8000',
+  // Send and store cookies on cross-origin calls, e.g. the backend's
+  // db_primary_until cookie that keeps reads after a write on the primary
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json'
   }